@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Employee Attrition Online Scoring Service
+
+Serves predictions from a saved pipeline artifact over local HTTP. Concurrent
+single-employee requests are coalesced into micro-batches within a short
+latency window, so the model is called once per batch instead of once per
+request.
+"""
+
+import argparse
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import attrition_analysis
+
+# Micro-batching defaults: flush when this many requests are waiting, or when
+# the oldest waiting request has waited this long
+MAX_BATCH_SIZE = 64
+MAX_WAIT_MS = 2.0
+
+# Upper bound on how long a request handler waits for its batch to be scored
+REQUEST_TIMEOUT_SECONDS = 5.0
+
+
+class MicroBatcher:
+    """
+    Coalesces single-record prediction requests into batches.
+    
+    Callers submit records and get a Future back; one background thread
+    collects requests until ``max_batch_size`` are waiting or ``max_wait_ms``
+    has passed since the first one arrived, then scores the whole batch with
+    a single predict_proba call. Gradient boosting models are scored by the
+    array-based CompiledEnsemble, whose fixed per-call cost suits small
+    batches; ``dtype=np.float32`` selects its float32 mode. Record lists
+    longer than COMPILED_MAX_ROWS are scored by the sklearn model itself.
+    
+    Each record is encoded on its own against the training schema (see
+    RecordScorer), so a malformed record fails only its own request and
+    never changes how the rest of its batch is encoded or scored.
+    
+    ``batch_count``, ``batched_records`` and ``largest_batch`` are running
+    totals over the micro-batches scored so far.
+    """
+    
+    def __init__(self, artifact: dict, max_batch_size: int = MAX_BATCH_SIZE, max_wait_ms: float = MAX_WAIT_MS,
+                 dtype=np.float64):
+        self.scorer = attrition_analysis.RecordScorer(artifact, dtype)
+        self.model = self.scorer.model
+        self.batch_model = artifact['model']
+        self.feature_columns = self.scorer.feature_columns
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.batch_count = 0
+        self.batched_records = 0
+        self.largest_batch = 0
+        
+        self._requests = queue.Queue()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+        self._thread.start()
+    
+    def submit(self, record: dict) -> Future:
+        """Queue one employee record for scoring."""
+        future = Future()
+        self._requests.put((record, future))
+        return future
+    
+    def score_records(self, records: list) -> list:
+        """
+        Score a list of employee records in one call. Records that cannot be
+        scored get ``{'error': message}`` in their place.
+        """
+        return [{'error': str(outcome)} if isinstance(outcome, Exception) else outcome
+                for outcome in self._score_batch(records)]
+    
+    def _score_batch(self, records: list) -> list:
+        """Each record's prediction, or the exception that prevented it, from one model call."""
+        features = np.zeros((len(records), len(self.feature_columns)), dtype=np.float32)
+        outcomes = [None] * len(records)
+        for i, record in enumerate(records):
+            try:
+                if not isinstance(record, dict):
+                    raise ValueError(f"Expected an employee record object, got {type(record).__name__}")
+                self.scorer.encode(record, features[i])
+            except ValueError as e:
+                outcomes[i] = e
+        
+        valid = [i for i, outcome in enumerate(outcomes) if outcome is None]
+        try:
+            self._score_rows(features, valid, outcomes)
+        except Exception:
+            # The model rejected something in the batch (e.g. a missing value):
+            # score the rows one at a time so only the offending records fail
+            for i in valid:
+                try:
+                    self._score_rows(features, [i], outcomes)
+                except Exception as e:
+                    outcomes[i] = e
+        return outcomes
+    
+    def _score_rows(self, features: np.ndarray, rows: list, outcomes: list):
+        if not rows:
+            return
+        X = features[rows]
+        model = attrition_analysis.compiled_or_model(self.model, self.batch_model, len(rows))
+        if not isinstance(model, attrition_analysis.CompiledEnsemble):
+            # sklearn models were fitted on named columns
+            X = pd.DataFrame(X, columns=self.feature_columns)
+        labels, proba = attrition_analysis._predict_labels(model, X)
+        for i, label, p in zip(rows, labels, proba[:, 1]):
+            outcomes[i] = {'predicted_attrition': label, 'attrition_probability': float(p)}
+    
+    def close(self):
+        """Stop the batching thread once the queued requests are scored."""
+        self._stopped.set()
+        self._thread.join()
+    
+    def _collect_batch(self) -> list:
+        """Block for the first request, then gather more until the batch is full or the window closes."""
+        try:
+            batch = [self._requests.get(timeout=0.1)]
+        except queue.Empty:
+            return []
+        
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._requests.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+    
+    def _run(self):
+        while not (self._stopped.is_set() and self._requests.empty()):
+            batch = self._collect_batch()
+            if not batch:
+                continue
+            
+            records, futures = zip(*batch)
+            self.batch_count += 1
+            self.batched_records += len(batch)
+            self.largest_batch = max(self.largest_batch, len(batch))
+            try:
+                outcomes = self._score_batch(list(records))
+            except Exception as e:
+                for future in futures:
+                    future.set_exception(e)
+                continue
+            for future, outcome in zip(futures, outcomes):
+                if isinstance(outcome, Exception):
+                    future.set_exception(outcome)
+                else:
+                    future.set_result(outcome)
+
+
+class ScoringRequestHandler(BaseHTTPRequestHandler):
+    """
+    HTTP API:
+    
+    - ``GET /health`` returns ``{"status": "ok"}``
+    - ``POST /predict`` with one employee record (JSON object) returns its
+      prediction, or 400 if the record cannot be scored; with a JSON list of
+      records returns a list of predictions, scored directly as one batch,
+      with ``{"error": ...}`` in place of any record that cannot be scored.
+    """
+    
+    def do_GET(self):
+        if self.path == '/health':
+            self._send_json(200, {'status': 'ok'})
+        else:
+            self._send_json(404, {'error': f"Unknown path {self.path}"})
+    
+    def do_POST(self):
+        if self.path != '/predict':
+            self._send_json(404, {'error': f"Unknown path {self.path}"})
+            return
+        
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            payload = json.loads(self.rfile.read(length))
+        except (ValueError, json.JSONDecodeError) as e:
+            self._send_json(400, {'error': f"Invalid JSON body: {e}"})
+            return
+        
+        batcher = self.server.batcher
+        try:
+            if isinstance(payload, list):
+                result = batcher.score_records(payload)
+            elif isinstance(payload, dict):
+                result = batcher.submit(payload).result(timeout=REQUEST_TIMEOUT_SECONDS)
+            else:
+                self._send_json(400, {'error': "Body must be an employee record or a list of records"})
+                return
+        except ValueError as e:
+            self._send_json(400, {'error': str(e)})
+            return
+        except Exception as e:
+            self._send_json(500, {'error': str(e)})
+            return
+        
+        self._send_json(200, result)
+    
+    def _send_json(self, status: int, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+    
+    def log_message(self, format, *args):
+        # Per-request access logging would dominate latency at high request rates
+        pass
+
+
+def create_server(artifact_path: Path = None, host: str = '127.0.0.1', port: int = 8000,
+                  max_batch_size: int = MAX_BATCH_SIZE, max_wait_ms: float = MAX_WAIT_MS,
+                  dtype=np.float64) -> ThreadingHTTPServer:
+    """Load the pipeline artifact and build a scoring server (not yet serving)."""
+    artifact = attrition_analysis.load_pipeline(artifact_path)
+    
+    server = ThreadingHTTPServer((host, port), ScoringRequestHandler)
+    server.daemon_threads = True
+    server.batcher = MicroBatcher(artifact, max_batch_size, max_wait_ms, dtype)
+    return server
+
+
+def serve(artifact_path: Path = None, host: str = '127.0.0.1', port: int = 8000,
+          max_batch_size: int = MAX_BATCH_SIZE, max_wait_ms: float = MAX_WAIT_MS, dtype=np.float64):
+    """Run the scoring service until interrupted."""
+    server = create_server(artifact_path, host, port, max_batch_size, max_wait_ms, dtype)
+    print(f"Scoring service listening on http://{host}:{server.server_port} "
+          f"(batches of up to {max_batch_size}, {max_wait_ms} ms window)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.batcher.close()
+
+
+def main(argv=None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Local attrition scoring service")
+    parser.add_argument('--artifact', type=Path, default=attrition_analysis.PIPELINE_ARTIFACT,
+                        help="Pipeline artifact produced by a training run")
+    parser.add_argument('--host', default='127.0.0.1', help="Interface to bind")
+    parser.add_argument('--port', type=int, default=8000, help="Port to listen on")
+    parser.add_argument('--max-batch-size', type=int, default=MAX_BATCH_SIZE,
+                        help="Largest micro-batch passed to the model")
+    parser.add_argument('--max-wait-ms', type=float, default=MAX_WAIT_MS,
+                        help="Longest a request waits for its micro-batch to fill")
+    parser.add_argument('--float32', action='store_true',
+                        help="Score in float32 (faster, not bit-identical to the sklearn model)")
+    args = parser.parse_args(argv)
+    
+    serve(args.artifact, args.host, args.port, args.max_batch_size, args.max_wait_ms,
+          np.float32 if args.float32 else np.float64)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Stage-Level Benchmark Suite for the Attrition Pipeline
+
+Times and memory-profiles each pipeline stage (loading, exploration,
+preprocessing, SMOTE, model fit, evaluation, prediction and the three report
+generators) on synthetic datasets at several multiples of the real data
+size, and compares the results against a stored baseline so performance
+regressions fail the run.
+"""
+
+import argparse
+import functools
+import json
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import warnings
+warnings.filterwarnings('ignore')
+
+import attrition_analysis
+from synthetic_attrition import SyntheticAttritionGenerator
+
+
+# Synthetic data sizes, as multiples of the real train/test row counts
+BENCHMARK_SCALES = (1, 4)
+
+# Baseline of per-stage results that runs are gated against
+BASELINE_PATH = Path(__file__).parent / 'benchmark_baseline.json'
+
+# A stage regresses when it is this much slower / larger than the baseline...
+TIME_TOLERANCE = 0.25
+MEMORY_TOLERANCE = 0.25
+
+# ...and the difference is above these floors, so timer noise on
+# millisecond-scale stages does not fail the gate
+MIN_TIME_DELTA_SECONDS = 0.05
+MIN_MEMORY_DELTA_MB = 5.0
+
+
+def synthesize_dataset(df: pd.DataFrame, scale: float, seed: int = 0) -> pd.DataFrame:
+    """
+    Synthesize ``scale`` times ``df``'s row count from a Gaussian copula
+    fitted to ``df`` (see synthetic_attrition), keeping the schema,
+    vocabularies, per-column distributions and correlations of the source
+    without duplicating its rows.
+    """
+    n_rows = max(int(round(len(df) * scale)), 2)
+    return SyntheticAttritionGenerator(df).sample(n_rows, np.random.default_rng(seed))
+
+
+def measure(results: dict, stage: str, func, *args, trace: bool = False, **kwargs):
+    """
+    Run ``func`` and record its wall and CPU time under ``stage``, or with
+    ``trace=True`` its peak traced memory instead. The two come from separate
+    runs: tracemalloc's allocation hooks slow stages down 2-12x, which would
+    swamp the timings.
+    """
+    if trace:
+        tracemalloc.start()
+        try:
+            value = func(*args, **kwargs)
+        finally:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        results[stage] = {'peak_mb': peak / 2**20}
+        print(f"  {stage:<32} peak {peak / 2**20:8.1f} MB")
+        return value
+    
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    value = func(*args, **kwargs)
+    wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+    
+    results[stage] = {'seconds': wall, 'cpu_seconds': cpu}
+    print(f"  {stage:<32} {wall:8.3f}s  cpu {cpu:8.3f}s")
+    return value
+
+
+def run_pipeline_stages(data_dir: Path, report_dir: Path, cv_jobs: int = 1, trace: bool = False) -> dict:
+    """
+    Run every pipeline stage once against the CSVs in ``data_dir``, writing
+    reports under ``report_dir``, and return per-stage timings, or with
+    ``trace=True`` per-stage peak traced memory (see measure()). Each run
+    starts from a cold dataset cache. Charts are skipped; chart rendering is
+    benchmarked by its own modes in main().
+    """
+    module = attrition_analysis
+    saved = {name: getattr(module, name)
+             for name in ('DATA_DIR', 'DATASET_CACHE_DIR', 'REPORT_DIR', 'MEDIA_DIR')}
+    module.DATA_DIR = data_dir
+    module.DATASET_CACHE_DIR = data_dir / '.cache'
+    shutil.rmtree(module.DATASET_CACHE_DIR, ignore_errors=True)
+    module.REPORT_DIR = report_dir
+    module.MEDIA_DIR = report_dir / 'media'
+    module.MEDIA_DIR.mkdir(parents=True, exist_ok=True)
+    
+    results = {}
+    record = functools.partial(measure, results, trace=trace)
+    try:
+        train_df, test_df = record('load_datasets', module.load_datasets)
+        train_analysis = record('explore_dataset', module.explore_dataset, train_df, "Training")
+        test_analysis = module.explore_dataset(test_df, "Test")
+        
+        train_processed, vocabulary = record('preprocess_data', module.preprocess_data,
+                                             train_df, is_training=True)
+        X = train_processed.drop('Attrition', axis=1)
+        y = train_processed['Attrition']
+        
+        from sklearn.model_selection import train_test_split
+        X_train, X_val, y_train, y_val = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+        
+        categorical_mask = [col in vocabulary for col in X_train.columns]
+        record('smote_resampling', module._resample_training_data,
+               X_train, y_train, 'gradient_boosting', categorical_mask)
+        model = record('build_model', module.build_model, X_train, y_train,
+                       categorical_columns=list(vocabulary))
+        model_results = record('evaluate_model', module.evaluate_model, model,
+                               X_train, y_train, X_val, y_val, plot_charts=False, cv_jobs=cv_jobs)
+        model_results['training_samples'] = len(X_train)
+        model_results['engine'] = 'gradient_boosting'
+        
+        test_processed, _ = module.preprocess_data(test_df, is_training=False, vocabulary=vocabulary)
+        test_processed = module.align_features(test_processed, X_train.columns)
+        predictions, prediction_proba = record('predict_test_data', module.predict_test_data,
+                                               model, test_processed)
+        
+        record('generate_ibm_dataset_report', module.generate_ibm_dataset_report,
+               train_analysis, test_analysis)
+        record('generate_attrition_model_report', module.generate_attrition_model_report,
+               model_results)
+        record('generate_attrition_report', module.generate_attrition_report,
+               test_df, predictions, prediction_proba)
+        record('write_test_predictions', module.write_test_predictions,
+               predictions, prediction_proba)
+    finally:
+        for name, value in saved.items():
+            setattr(module, name, value)
+    
+    return results
+
+
+def _best_of(runs: list) -> dict:
+    """Per-stage minimum of each measurement over repeated runs."""
+    return {stage: {metric: min(run[stage][metric] for run in runs) for metric in runs[0][stage]}
+            for stage in runs[0]}
+
+
+def run_benchmarks(scales=BENCHMARK_SCALES, cv_jobs: int = 1, repeat: int = 1) -> dict:
+    """
+    Benchmark every stage at each synthetic scale, keeping the best time of
+    ``repeat`` untraced runs and the peak memory of one further traced run;
+    returns {scale: {stage: measurements}}.
+    """
+    # Import the lazily loaded training stacks up front so the first scale's
+    # SMOTE and model stages are not charged for module import time
+    import imblearn.over_sampling, sklearn.ensemble, sklearn.metrics, sklearn.model_selection  # noqa: F401
+    
+    train_df, test_df = attrition_analysis.load_datasets()
+    
+    benchmarks = {}
+    for scale in scales:
+        with tempfile.TemporaryDirectory() as workdir:
+            workdir = Path(workdir)
+            data_dir = workdir / 'data'
+            data_dir.mkdir()
+            synthesize_dataset(train_df, scale, seed=0).to_csv(data_dir / 'train.csv', index=False)
+            synthesize_dataset(test_df, scale, seed=1).to_csv(data_dir / 'test.csv', index=False)
+            
+            print(f"\n{'=' * 80}\nSCALE x{scale}: {int(round(len(train_df) * scale)):,} training rows\n{'=' * 80}")
+            runs = [run_pipeline_stages(data_dir, workdir / 'reports', cv_jobs) for _ in range(repeat)]
+            print("\nMemory (tracemalloc, separate run):")
+            memory = run_pipeline_stages(data_dir, workdir / 'reports', cv_jobs, trace=True)
+            benchmarks[str(scale)] = {stage: {**timing, **memory[stage]}
+                                      for stage, timing in _best_of(runs).items()}
+    
+    return benchmarks
+
+
+def compare_to_baseline(benchmarks: dict, baseline: dict, time_tolerance: float = TIME_TOLERANCE,
+                        memory_tolerance: float = MEMORY_TOLERANCE) -> list:
+    """
+    Return one message per stage that is slower or uses more memory than its
+    baseline beyond the tolerances. Stages or scales missing from the
+    baseline are not gated.
+    """
+    regressions = []
+    for scale, stages in benchmarks.items():
+        for stage, current in stages.items():
+            reference = baseline.get(scale, {}).get(stage)
+            if reference is None:
+                continue
+            
+            seconds, base_seconds = current['seconds'], reference['seconds']
+            if seconds > base_seconds * (1 + time_tolerance) and seconds - base_seconds > MIN_TIME_DELTA_SECONDS:
+                regressions.append(f"x{scale} {stage}: {seconds:.3f}s vs baseline {base_seconds:.3f}s")
+            
+            peak, base_peak = current['peak_mb'], reference['peak_mb']
+            if peak > base_peak * (1 + memory_tolerance) and peak - base_peak > MIN_MEMORY_DELTA_MB:
+                regressions.append(f"x{scale} {stage}: peak {peak:.1f} MB vs baseline {base_peak:.1f} MB")
+    
+    return regressions
+
+
+def main(argv=None) -> int:
+    """
+    Command-line entry point; returns 1 when any stage regressed against the
+    baseline, and 2 when there is no baseline to gate against (unless
+    ``--allow-missing-baseline`` is given).
+    """
+    parser = argparse.ArgumentParser(description="Stage-level attrition pipeline benchmarks")
+    parser.add_argument('--scales', type=float, nargs='+', default=list(BENCHMARK_SCALES),
+                        help="Synthetic data sizes as multiples of the real dataset")
+    parser.add_argument('--cv-jobs', type=int, default=1,
+                        help="Cross-validation worker processes (1 keeps timings comparable)")
+    parser.add_argument('--repeat', type=int, default=1,
+                        help="Timed runs per scale; the best time of each stage is kept")
+    parser.add_argument('--baseline', type=Path, default=BASELINE_PATH, help="Baseline results file")
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="Record this run as the new baseline instead of gating against it")
+    parser.add_argument('--allow-missing-baseline', action='store_true',
+                        help="Pass without gating when the baseline file does not exist")
+    parser.add_argument('--output', type=Path, help="Also write this run's results to a JSON file")
+    parser.add_argument('--time-tolerance', type=float, default=TIME_TOLERANCE)
+    parser.add_argument('--memory-tolerance', type=float, default=MEMORY_TOLERANCE)
+    args = parser.parse_args(argv)
+    
+    # Fail before the (slow) benchmarks run: without a baseline the gate cannot pass
+    baseline_missing = not args.save_baseline and not args.baseline.exists()
+    if baseline_missing and not args.allow_missing_baseline:
+        print(f"No baseline at {args.baseline}; record one with --save-baseline on this machine, "
+              "or pass --allow-missing-baseline to run without gating")
+        return 2
+    
+    scales = [int(scale) if float(scale).is_integer() else scale for scale in args.scales]
+    benchmarks = run_benchmarks(scales, args.cv_jobs, args.repeat)
+    run = {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'benchmarks': benchmarks,
+    }
+    
+    if args.output:
+        args.output.write_text(json.dumps(run, indent=2))
+        print(f"\nResults saved to {args.output}")
+    
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(run, indent=2))
+        print(f"\nBaseline saved to {args.baseline}")
+        return 0
+    
+    if baseline_missing:
+        print(f"\nNo baseline at {args.baseline}; not gating (--allow-missing-baseline)")
+        return 0
+    
+    regressions = compare_to_baseline(benchmarks, json.loads(args.baseline.read_text())['benchmarks'],
+                                      args.time_tolerance, args.memory_tolerance)
+    print(f"\n{'=' * 80}")
+    if regressions:
+        print(f"PERFORMANCE REGRESSIONS ({len(regressions)}):")
+        for regression in regressions:
+            print(f"  ✗ {regression}")
+        return 1
+    print("✓ All stages within tolerance of the baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Shared Test Fixtures
+
+Trains the attrition pipeline once and caches it on disk (under pytest's
+cache directory) keyed by the training data and the source of the code that
+produces it. Later runs, and parallel pytest-xdist workers, load the cached
+artifact instead of retraining; ``--retrain-model`` forces a fresh fit.
+With the cache plugin disabled (``-p no:cacheprovider``) the model is
+trained once per session into a temporary directory.
+"""
+
+import contextlib
+from pathlib import Path
+
+import pytest
+import warnings
+warnings.filterwarnings('ignore')
+
+import attrition_analysis
+
+
+DATA_DIR = Path('/tmp/employee-data')
+
+
+def pytest_addoption(parser):
+    parser.addoption('--retrain-model', action='store_true',
+                     help="Retrain the shared test model instead of loading it from the cache")
+
+
+def split_training_data():
+    """Preprocess train.csv with the pipeline's own preprocess_data and split it as main() does."""
+    from sklearn.model_selection import train_test_split
+    train_df = attrition_analysis.read_dataset(DATA_DIR / 'train.csv')
+    train_processed, vocabulary = attrition_analysis.preprocess_data(train_df, is_training=True)
+    X = train_processed.drop('Attrition', axis=1)
+    y = train_processed['Attrition']
+    X_train, X_val, y_train, y_val = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+    return vocabulary, X_train, X_val, y_train, y_val
+
+
+@pytest.fixture(scope="session", autouse=True)
+def dataset_cache_dir(tmp_path_factory):
+    """Keep the Feather dataset cache entries written by tests (e.g. through score()) out of DATA_DIR."""
+    original = attrition_analysis.DATASET_CACHE_DIR
+    attrition_analysis.DATASET_CACHE_DIR = tmp_path_factory.mktemp('dataset-cache')
+    yield attrition_analysis.DATASET_CACHE_DIR
+    attrition_analysis.DATASET_CACHE_DIR = original
+
+
+@contextlib.contextmanager
+def _exclusive(lock_path: Path):
+    """Hold an exclusive lock on ``lock_path`` so only one test worker trains at a time."""
+    try:
+        import fcntl
+    except ImportError:  # No advisory locks (Windows): workers may train concurrently
+        yield
+        return
+    with open(lock_path, 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+@pytest.fixture(scope="session")
+def training_data():
+    """The real preprocessed training data: (vocabulary, X_train, X_val, y_train, y_val)."""
+    return split_training_data()
+
+
+@pytest.fixture(scope="session")
+def pipeline_artifact(request, training_data, tmp_path_factory):
+    """
+    Path to a pipeline artifact trained with build_model() on the training
+    split, loaded from the on-disk cache when the data and code are unchanged.
+    """
+    module = attrition_analysis
+    config_cache = getattr(request.config, 'cache', None)
+    if config_cache is not None:
+        cache_root = Path(config_cache.mkdir('attrition-model'))
+    else:
+        cache_root = tmp_path_factory.mktemp('attrition-model')
+    cache = module.StageCache(cache_root)
+    key = cache.key(
+        'test-model', data=[DATA_DIR / 'train.csv'],
+        code=[split_training_data, module.read_dataset, module.preprocess_data, module.fit_vocabulary,
+              module._category_codes, module.encode_categoricals, module._resample_training_data,
+              module.ChunkedSMOTE, module._smote_engine, module._balance_training_data, module._make_estimator,
+              module.build_model],
+        packages=('scikit-learn', 'imbalanced-learn', 'numpy', 'pandas', 'pyarrow'),
+        settings=module._model_stage_settings(),
+    )
+    
+    with _exclusive(cache_root / '.lock'):
+        hit, model = (False, None) if request.config.getoption('--retrain-model') else cache.load('test-model', key)
+        if not hit:
+            vocabulary, X_train, X_val, y_train, y_val = training_data
+            model = module.build_model(X_train, y_train, categorical_columns=list(vocabulary))
+            cache.save('test-model', key, model)
+    
+    vocabulary, X_train, *_ = training_data
+    return module.save_pipeline(model, vocabulary, X_train.columns,
+                                tmp_path_factory.mktemp('pipeline') / 'pipeline.joblib')
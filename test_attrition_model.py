@@ -6,6 +6,12 @@ This test suite validates that the attrition prediction model achieves
 at least 95% accuracy on the validation dataset.
 """
 
+import io
+import json
+import os
+import subprocess
+import sys
+
 import pytest
 import pandas as pd
 import numpy as np
@@ -14,79 +20,49 @@ from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import LabelEncoder
 from sklearn.ensemble import GradientBoostingClassifier
 from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
-from imblearn.over_sampling import SMOTE
 import warnings
 warnings.filterwarnings('ignore')
 
+import attrition_analysis
+
 
 DATA_DIR = Path('/tmp/employee-data')
 
+# Cold `import attrition_analysis` must stay within this budget so scoring
+# workers and CLI invocations start fast (pandas alone is ~0.4s)
+IMPORT_TIME_BUDGET_SECONDS = 1.5
 
-def preprocess_data_for_test(df: pd.DataFrame, is_training: bool = True):
-    """Preprocess data for testing."""
-    df_processed = df.copy()
-    
-    # Drop unnecessary columns
-    columns_to_drop = ['EmployeeCount', 'EmployeeNumber', 'StandardHours', 'Over18']
-    for col in columns_to_drop:
-        if col in df_processed.columns:
-            df_processed = df_processed.drop(col, axis=1)
-    
-    # Attrition is already encoded as 0/1 in this dataset
-    # Just verify it's numeric for training data
-    if is_training and 'Attrition' in df_processed.columns:
-        if df_processed['Attrition'].dtype == 'object':
-            df_processed['Attrition'] = df_processed['Attrition'].map({'Yes': 1, 'No': 0})
-    
-    # Encode categorical variables
-    categorical_columns = df_processed.select_dtypes(include=['object']).columns
-    
-    for col in categorical_columns:
-        if col != 'Attrition' or not is_training:
-            le = LabelEncoder()
-            df_processed[col] = le.fit_transform(df_processed[col].astype(str))
-    
-    return df_processed
+
+@pytest.fixture(scope="module")
+def load_training_data(training_data):
+    """Training and validation split of the data encoded by preprocess_data()."""
+    vocabulary, X_train, X_val, y_train, y_val = training_data
+    return X_train, X_val, y_train, y_val
 
 
 @pytest.fixture(scope="module")
-def load_training_data():
-    """Load and preprocess training data."""
-    train_df = pd.read_csv(DATA_DIR / 'train.csv')
-    train_processed = preprocess_data_for_test(train_df, is_training=True)
-    
-    X = train_processed.drop('Attrition', axis=1)
-    y = train_processed['Attrition']
-    
-    return train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+def trained_model(pipeline_artifact, load_training_data):
+    """The shared gradient boosting model (see conftest.py), with its training split."""
+    model = attrition_analysis.load_pipeline(pipeline_artifact)['model']
+    return (model, *load_training_data)
 
 
 @pytest.fixture(scope="module")
-def trained_model(load_training_data):
-    """Train the Gradient Boosting model with SMOTE."""
-    X_train, X_val, y_train, y_val = load_training_data
-    
-    # Apply SMOTE to training data
-    smote = SMOTE(random_state=42, k_neighbors=5)
-    X_train_resampled, y_train_resampled = smote.fit_resample(X_train, y_train)
-    
-    model = GradientBoostingClassifier(
-        n_estimators=300,
-        learning_rate=0.05,
-        max_depth=5,
-        min_samples_split=10,
-        min_samples_leaf=5,
-        subsample=0.8,
-        random_state=42,
-        max_features='sqrt',
-        validation_fraction=0.1,
-        n_iter_no_change=20,
-        tol=0.0001
-    )
-    
-    model.fit(X_train_resampled, y_train_resampled)
-    
-    return model, X_train, X_val, y_train, y_val
+def hist_model(training_data):
+    """Train the histogram-based engine with native categoricals."""
+    vocabulary, X_train, X_val, y_train, y_val = training_data
+    model = attrition_analysis.build_model(X_train, y_train, engine='hist_gradient_boosting',
+                                           categorical_columns=list(vocabulary))
+    return model, vocabulary, X_train, X_val, y_val
+
+
+@pytest.fixture(scope="module")
+def scored_test_data():
+    """Test rows with deterministic pseudo-predictions."""
+    test_df = attrition_analysis.read_dataset(DATA_DIR / 'test.csv')
+    rng = np.random.default_rng(0)
+    probability = rng.random(len(test_df))
+    return test_df, (probability > 0.5).astype(int), probability
 
 
 class TestAttritionModel:
@@ -187,6 +163,19 @@ class TestAttritionModel:
         assert len(model.feature_importances_) == X_train.shape[1], "Should have importance for each feature"
         assert np.sum(model.feature_importances_) > 0, "Feature importances should be non-zero"
     
+    def test_parallel_cv_matches_cross_val_score(self, load_training_data):
+        """Test that the fold-parallel CV engine reproduces cross_val_score and reports timings."""
+        from sklearn.model_selection import cross_val_score
+        X_train, X_val, y_train, y_val = load_training_data
+        model = GradientBoostingClassifier(n_estimators=20, max_depth=3, random_state=42)
+        
+        results = attrition_analysis.cross_validate_parallel(model, X_train, y_train, cv=5, n_jobs=2)
+        expected = cross_val_score(model, X_train, y_train, cv=5, scoring='accuracy')
+        
+        np.testing.assert_allclose(results['scores'], expected)
+        assert len(results['fit_times']) == 5 and np.all(results['fit_times'] > 0)
+        assert len(results['score_times']) == 5
+    
     def test_prediction_probabilities(self, trained_model):
         """Test that model provides probability estimates."""
         model, X_train, X_val, y_train, y_val = trained_model
@@ -204,38 +193,1008 @@ class TestAttritionModel:
         assert np.all(y_proba >= 0) and np.all(y_proba <= 1), "Probabilities should be between 0 and 1"
 
 
+class TestHistGradientBoostingEngine:
+    """Test suite for the histogram-based boosting engine option."""
+    
+    def test_categoricals_are_native(self, hist_model):
+        """Test that label-encoded columns are treated as native categories."""
+        model, vocabulary, X_train, X_val, y_val = hist_model
+        
+        categorical = X_train.columns[model.is_categorical_].tolist()
+        assert set(categorical) == set(vocabulary)
+    
+    def test_report_surface_matches_gradient_boosting(self, hist_model):
+        """Test that feature_importances_ and predict_proba are available for the reports."""
+        model, vocabulary, X_train, X_val, y_val = hist_model
+        
+        assert len(model.feature_importances_) == X_train.shape[1]
+        assert np.isclose(model.feature_importances_.sum(), 1.0)
+        proba = model.predict_proba(X_val)
+        assert proba.shape == (len(X_val), 2)
+        assert accuracy_score(y_val, model.predict(X_val)) >= 0.80
+    
+    def test_unseen_categories_are_scored(self, hist_model):
+        """Test that the -1 unknown-category code is scored rather than rejected."""
+        model, vocabulary, X_train, X_val, y_val = hist_model
+        
+        X_unknown = X_val.head(5).copy()
+        X_unknown['Department'] = -1
+        assert model.predict_proba(X_unknown).shape == (5, 2)
+    
+    def test_unknown_engine_rejected(self, load_training_data):
+        """Test that an unknown engine name fails fast."""
+        X_train, X_val, y_train, y_val = load_training_data
+        with pytest.raises(ValueError):
+            attrition_analysis.build_model(X_train, y_train, engine='xgboost')
+
+
+class TestCompiledEnsemble:
+    """Test suite for the array-based inference engine."""
+    
+    def test_bit_identical_to_sklearn(self, trained_model, monkeypatch):
+        """Test that float64 probabilities match predict_proba exactly, across chunk boundaries."""
+        model, X_train, X_val, y_train, y_val = trained_model
+        monkeypatch.setattr(attrition_analysis, 'COMPILED_BATCH_ROWS', 37)
+        compiled = attrition_analysis.CompiledEnsemble(model)
+        
+        X = pd.concat([X_train, X_val])
+        np.testing.assert_array_equal(compiled.predict_proba(X), model.predict_proba(X))
+        np.testing.assert_array_equal(compiled.predict_proba(X.head(1)), model.predict_proba(X.head(1)))
+        np.testing.assert_array_equal(compiled.predict(X_val), model.predict(X_val))
+    
+    def test_missing_values_rejected_like_sklearn(self, trained_model):
+        """Test that NaN inputs are rejected, as sklearn's predict_proba rejects them."""
+        model, X_train, X_val, y_train, y_val = trained_model
+        compiled = attrition_analysis.CompiledEnsemble(model)
+        
+        X_missing = X_val.head(20).astype(float)
+        X_missing.iloc[::2, ::3] = np.nan
+        with pytest.raises(ValueError):
+            model.predict_proba(X_missing)
+        with pytest.raises(ValueError):
+            compiled.predict_proba(X_missing)
+    
+    def test_float32_mode(self, trained_model):
+        """Test that float32 mode stays within float32 rounding of the exact scores."""
+        model, X_train, X_val, y_train, y_val = trained_model
+        compiled = attrition_analysis.CompiledEnsemble(model, dtype=np.float32)
+        
+        proba = compiled.predict_proba(X_val)
+        assert proba.dtype == np.float32
+        np.testing.assert_allclose(proba, model.predict_proba(X_val), atol=1e-5)
+    
+    def test_unsupported_models_fall_back(self, hist_model):
+        """Test that compile_model returns models it cannot compile unchanged."""
+        model = hist_model[0]
+        assert attrition_analysis.compile_model(model) is model
+        with pytest.raises(TypeError):
+            attrition_analysis.CompiledEnsemble(model)
+
+
+class TestSegmentAggregation:
+    """Test suite for the report segment aggregation engine."""
+    
+    def test_matches_groupby(self, scored_test_data):
+        """Test that segment tables match a plain pandas groupby."""
+        test_df, predicted, probability = scored_test_data
+        tables = attrition_analysis.aggregate_segments(
+            {'Department': test_df['Department']}, predicted, probability)
+        
+        frame = pd.DataFrame({'Department': test_df['Department'].astype(str),
+                              'predicted': predicted, 'probability': probability})
+        expected = frame.groupby('Department').agg(
+            Predicted_Attrition=('predicted', 'sum'), Total=('predicted', 'size'),
+            Attrition_Probability=('probability', 'mean'))
+        table = tables['Department']
+        
+        assert table.index.astype(str).tolist() == expected.index.tolist()
+        np.testing.assert_array_equal(table['Predicted_Attrition'], expected['Predicted_Attrition'])
+        np.testing.assert_array_equal(table['Total'], expected['Total'])
+        np.testing.assert_allclose(table['Attrition_Probability'], expected['Attrition_Probability'])
+        np.testing.assert_allclose(table['Attrition_Rate'],
+                                   expected['Predicted_Attrition'] / expected['Total'] * 100)
+    
+    def test_composite_keys_and_empty_segments(self, scored_test_data):
+        """Test multi-column keys, and that categories with no rows are dropped."""
+        test_df, predicted, probability = scored_test_data
+        age_group = pd.cut(test_df['Age'], bins=[0, 30, 40, 50, 100, 200],
+                           labels=['<30', '30-40', '40-50', '50+', '100+'])
+        tables = attrition_analysis.aggregate_segments(
+            {'Age Group': age_group, 'Department x OverTime': test_df[['Department', 'OverTime']]},
+            predicted, probability)
+        
+        assert '100+' not in tables['Age Group'].index
+        assert tables['Age Group']['Total'].sum() == len(test_df)
+        assert tables['Department x OverTime'].index.names == ['Department', 'OverTime']
+        assert tables['Department x OverTime']['Total'].sum() == len(test_df)
+
+
 class TestDataQuality:
     """Test suite for data quality checks."""
     
     def test_training_data_loads(self):
         """Test that training data loads successfully."""
-        train_df = pd.read_csv(DATA_DIR / 'train.csv')
+        train_df = attrition_analysis.read_dataset(DATA_DIR / 'train.csv')
         
         assert len(train_df) > 0, "Training data should not be empty"
         assert 'Attrition' in train_df.columns, "Training data should have Attrition column"
     
     def test_test_data_loads(self):
         """Test that test data loads successfully."""
-        test_df = pd.read_csv(DATA_DIR / 'test.csv')
+        test_df = attrition_analysis.read_dataset(DATA_DIR / 'test.csv')
         
         assert len(test_df) > 0, "Test data should not be empty"
     
     def test_no_missing_values_in_training(self):
         """Test that training data has no missing values."""
-        train_df = pd.read_csv(DATA_DIR / 'train.csv')
+        train_df = attrition_analysis.read_dataset(DATA_DIR / 'train.csv')
         
         missing = train_df.isnull().sum().sum()
         assert missing == 0, f"Training data has {missing} missing values"
     
+    def test_loader_uses_compact_schema(self):
+        """Test that the loader applies the declared compact dtypes without changing values."""
+        train_df = attrition_analysis.read_dataset(DATA_DIR / 'train.csv', use_cache=False)
+        raw_df = pd.read_csv(DATA_DIR / 'train.csv')
+        
+        assert train_df['JobSatisfaction'].dtype == np.int8
+        assert train_df['YearsAtCompany'].dtype == np.int16
+        assert train_df['MonthlyIncome'].dtype == np.float32
+        assert isinstance(train_df['Department'].dtype, pd.CategoricalDtype)
+        assert train_df.memory_usage(deep=True).sum() < raw_df.memory_usage(deep=True).sum()
+        np.testing.assert_array_equal(train_df['MonthlyIncome'].to_numpy(), raw_df['MonthlyIncome'].to_numpy())
+        assert train_df['Department'].astype(str).tolist() == raw_df['Department'].astype(str).tolist()
+    
+    def test_dataset_cache_round_trip(self, tmp_path, monkeypatch):
+        """Test that the columnar cache is built on first read and returns identical frames."""
+        if attrition_analysis.CSV_ENGINE != 'pyarrow':
+            pytest.skip("dataset cache requires pyarrow")
+        monkeypatch.setattr(attrition_analysis, 'DATASET_CACHE_DIR', tmp_path)
+        
+        parsed = attrition_analysis.read_dataset(DATA_DIR / 'train.csv', use_cache=True)
+        assert len(list(tmp_path.glob('train-*.feather'))) == 1
+        cached = attrition_analysis.read_dataset(DATA_DIR / 'train.csv', use_cache=True)
+        
+        pd.testing.assert_frame_equal(parsed, cached)
+        
+        # Reads that do not opt in (retraining and streaming inputs) leave the cache alone
+        attrition_analysis.read_dataset(DATA_DIR / 'test.csv')
+        assert not list(tmp_path.glob('test-*.feather'))
+    
+    def test_dataset_cache_replaces_stale_entries(self, tmp_path, monkeypatch):
+        """Test that rewriting the source file invalidates its cache entry and prunes the old one."""
+        if attrition_analysis.CSV_ENGINE != 'pyarrow':
+            pytest.skip("dataset cache requires pyarrow")
+        monkeypatch.setattr(attrition_analysis, 'DATASET_CACHE_DIR', tmp_path / 'cache')
+        source = tmp_path / 'train.csv'
+        raw_df = pd.read_csv(DATA_DIR / 'train.csv')
+        
+        raw_df.to_csv(source, index=False)
+        assert len(attrition_analysis.read_dataset(source, use_cache=True)) == len(raw_df)
+        first_entry, = (tmp_path / 'cache').glob('train-*.feather')
+        raw_df.head(10).to_csv(source, index=False)
+        assert len(attrition_analysis.read_dataset(source, use_cache=True)) == 10
+        second_entry, = (tmp_path / 'cache').glob('train-*.feather')
+        assert second_entry != first_entry
+    
+    def test_same_size_rewrite_is_reparsed(self, tmp_path, monkeypatch):
+        """Test that a rewrite keeping the file size still misses the cache through its new mtime."""
+        if attrition_analysis.CSV_ENGINE != 'pyarrow':
+            pytest.skip("dataset cache requires pyarrow")
+        monkeypatch.setattr(attrition_analysis, 'DATASET_CACHE_DIR', tmp_path / 'cache')
+        source = tmp_path / 'train.csv'
+        raw_df = pd.read_csv(DATA_DIR / 'train.csv').head(50)
+        raw_df.to_csv(source, index=False)
+        first_age = attrition_analysis.read_dataset(source, use_cache=True)['Age'].iloc[0]
+        
+        # Same digit count, so the file keeps its size
+        raw_df.loc[0, 'Age'] = 10 + (first_age + 1) % 90
+        raw_df.to_csv(source, index=False)
+        stat = source.stat()
+        os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        
+        assert attrition_analysis.read_dataset(source, use_cache=True)['Age'].iloc[0] == raw_df.loc[0, 'Age']
+        assert len(list((tmp_path / 'cache').glob('train-*.feather'))) == 1
+    
+    def test_score_caches_its_input_until_rewritten(self, pipeline_artifact, tmp_path, monkeypatch):
+        """Test that score() reads its input through the cache and re-parses it once the file changes."""
+        if attrition_analysis.CSV_ENGINE != 'pyarrow':
+            pytest.skip("dataset cache requires pyarrow")
+        monkeypatch.setattr(attrition_analysis, 'DATASET_CACHE_DIR', tmp_path / 'cache')
+        source = tmp_path / 'employees.csv'
+        raw_df = pd.read_csv(DATA_DIR / 'test.csv')
+        raw_df.head(30).to_csv(source, index=False)
+        
+        first = attrition_analysis.score(source, artifact_path=pipeline_artifact)
+        first_entry, = (tmp_path / 'cache').glob('employees-*.feather')
+        raw_df.tail(20).to_csv(source, index=False)
+        second = attrition_analysis.score(source, artifact_path=pipeline_artifact)
+        second_entry, = (tmp_path / 'cache').glob('employees-*.feather')
+        
+        assert len(first) == 30 and len(second) == 20 and second_entry != first_entry
+        expected = attrition_analysis.score(DATA_DIR / 'test.csv', artifact_path=pipeline_artifact).tail(20)
+        np.testing.assert_array_equal(second['Attrition_Probability'], expected['Attrition_Probability'])
+    
+    def test_same_named_files_are_cached_apart(self, tmp_path, monkeypatch):
+        """Test that CSVs with the same name in different directories keep separate entries."""
+        if attrition_analysis.CSV_ENGINE != 'pyarrow':
+            pytest.skip("dataset cache requires pyarrow")
+        monkeypatch.setattr(attrition_analysis, 'DATASET_CACHE_DIR', tmp_path / 'cache')
+        raw_df = pd.read_csv(DATA_DIR / 'train.csv')
+        for i, directory in enumerate(('a', 'b')):
+            (tmp_path / directory).mkdir()
+            raw_df.iloc[i * 20:i * 20 + 10].to_csv(tmp_path / directory / 'train.csv', index=False)
+            attrition_analysis.read_dataset(tmp_path / directory / 'train.csv', use_cache=True)
+        
+        assert len(list((tmp_path / 'cache').glob('train-*.feather'))) == 2
+        second = attrition_analysis.read_dataset(tmp_path / 'b' / 'train.csv', use_cache=True)
+        assert second['EmployeeNumber'].tolist() == raw_df['EmployeeNumber'].iloc[20:30].tolist()
+    
     def test_attrition_column_values(self):
         """Test that Attrition column has correct values."""
-        train_df = pd.read_csv(DATA_DIR / 'train.csv')
+        train_df = attrition_analysis.read_dataset(DATA_DIR / 'train.csv')
         
         unique_values = train_df['Attrition'].unique()
         # Attrition column is already encoded as 0/1
         assert set(unique_values).issubset({0, 1, 'Yes', 'No'}), "Attrition should have 0/1 or Yes/No values"
 
 
+class TestPipelineArtifact:
+    """Test suite for the persisted pipeline artifact and score-only mode."""
+    
+    def test_artifact_round_trip(self, trained_model, tmp_path):
+        """Test that a saved artifact reloads with model, vocabulary and column order."""
+        model, X_train, X_val, y_train, y_val = trained_model
+        train_df = attrition_analysis.read_dataset(DATA_DIR / 'train.csv')
+        _, vocabulary = attrition_analysis.preprocess_data(train_df, is_training=True)
+        
+        path = attrition_analysis.save_pipeline(model, vocabulary, X_train.columns,
+                                                tmp_path / 'pipeline.joblib')
+        artifact = attrition_analysis.load_pipeline(path)
+        
+        assert artifact['artifact_version'] == attrition_analysis.ARTIFACT_VERSION
+        assert artifact['feature_columns'] == X_train.columns.tolist()
+        assert artifact['vocabulary'] == vocabulary
+        np.testing.assert_array_equal(artifact['model'].predict(X_val), model.predict(X_val))
+    
+    def test_score_matches_in_memory_predictions(self, trained_model, tmp_path):
+        """Test that score-only mode reproduces the in-memory model's predictions."""
+        model, X_train, X_val, y_train, y_val = trained_model
+        train_df = attrition_analysis.read_dataset(DATA_DIR / 'train.csv')
+        _, vocabulary = attrition_analysis.preprocess_data(train_df, is_training=True)
+        path = attrition_analysis.save_pipeline(model, vocabulary, X_train.columns,
+                                                tmp_path / 'pipeline.joblib')
+        
+        results = attrition_analysis.score(DATA_DIR / 'test.csv', tmp_path / 'scored.csv', path)
+        
+        test_df = attrition_analysis.read_dataset(DATA_DIR / 'test.csv')
+        test_processed, _ = attrition_analysis.preprocess_data(test_df, is_training=False,
+                                                               vocabulary=vocabulary)
+        test_processed = attrition_analysis.align_features(test_processed, X_train.columns)
+        expected = model.predict_proba(test_processed)[:, 1]
+        
+        assert len(results) == len(test_df)
+        np.testing.assert_allclose(results['Attrition_Probability'], expected)
+        assert (tmp_path / 'scored.csv').exists()
+    
+    def test_streaming_score_matches_single_pass(self, trained_model, tmp_path):
+        """Test that chunked streaming scoring produces the same output as one-shot scoring."""
+        model, X_train, X_val, y_train, y_val = trained_model
+        train_df = attrition_analysis.read_dataset(DATA_DIR / 'train.csv')
+        _, vocabulary = attrition_analysis.preprocess_data(train_df, is_training=True)
+        path = attrition_analysis.save_pipeline(model, vocabulary, X_train.columns,
+                                                tmp_path / 'pipeline.joblib')
+        
+        expected = attrition_analysis.score(DATA_DIR / 'test.csv', artifact_path=path)
+        rows = attrition_analysis.score_stream(DATA_DIR / 'test.csv', tmp_path / 'streamed.csv',
+                                               path, chunksize=50)
+        streamed = pd.read_csv(tmp_path / 'streamed.csv')
+        
+        assert rows == len(expected)
+        assert streamed['Predicted_Attrition'].tolist() == expected['Predicted_Attrition'].tolist()
+        np.testing.assert_allclose(streamed['Attrition_Probability'], expected['Attrition_Probability'])
+    
+    def test_predict_one_matches_batch_scoring(self, trained_model, tmp_path):
+        """Test that single-record scoring gives exactly the batch-scored probabilities."""
+        model, X_train, X_val, y_train, y_val = trained_model
+        train_df = attrition_analysis.read_dataset(DATA_DIR / 'train.csv')
+        _, vocabulary = attrition_analysis.preprocess_data(train_df, is_training=True)
+        path = attrition_analysis.save_pipeline(model, vocabulary, X_train.columns,
+                                                tmp_path / 'pipeline.joblib')
+        
+        expected = attrition_analysis.score(DATA_DIR / 'test.csv', artifact_path=path)
+        test_df = attrition_analysis.read_dataset(DATA_DIR / 'test.csv')
+        records = json.loads(test_df.to_json(orient='records'))
+        
+        probabilities = [attrition_analysis.predict_one(record, path) for record in records]
+        np.testing.assert_array_equal(probabilities, expected['Attrition_Probability'])
+    
+    def test_predict_one_encodes_like_preprocess_data(self, trained_model, tmp_path):
+        """Test unseen categories, absent fields and non-compiled models on the single-record path."""
+        model, X_train, X_val, y_train, y_val = trained_model
+        train_df = attrition_analysis.read_dataset(DATA_DIR / 'train.csv')
+        _, vocabulary = attrition_analysis.preprocess_data(train_df, is_training=True)
+        artifact = {'model': model, 'vocabulary': vocabulary, 'feature_columns': list(X_train.columns)}
+        
+        record = json.loads(attrition_analysis.read_dataset(DATA_DIR / 'test.csv').head(1).to_json(orient='records'))[0]
+        record['Department'] = 'Space Exploration'
+        del record['DistanceFromHome']
+        
+        frame, _ = attrition_analysis.preprocess_data(pd.DataFrame([record]), is_training=False,
+                                                      vocabulary=vocabulary)
+        frame = attrition_analysis.align_features(frame, X_train.columns)
+        expected = model.predict_proba(frame)[0, 1]
+        
+        assert attrition_analysis.RecordScorer(artifact).predict_one(record) == expected
+        
+        # A model without a compiled form is scored through its own predict_proba
+        uncompiled = attrition_analysis.RecordScorer(artifact)
+        uncompiled.model = model
+        assert uncompiled.predict_one(record) == pytest.approx(expected)
+    
+    def test_frozen_vocabulary_handles_unseen_categories(self):
+        """Test that categories unseen in training fall into the unknown bucket rather than failing."""
+        train_df = attrition_analysis.read_dataset(DATA_DIR / 'train.csv')
+        _, vocabulary = attrition_analysis.preprocess_data(train_df, is_training=True)
+        
+        test_df = attrition_analysis.read_dataset(DATA_DIR / 'test.csv').head(3)
+        test_df['Department'] = 'Brand New Department'
+        processed, _ = attrition_analysis.preprocess_data(test_df, is_training=False,
+                                                          vocabulary=vocabulary)
+        
+        assert (processed['Department'] == attrition_analysis.UNKNOWN_CATEGORY).all()
+    
+    def test_frozen_vocabulary_is_never_extended(self):
+        """Test that numeric columns sent as text are parsed rather than label-encoded, and stray text is rejected."""
+        train_df = attrition_analysis.read_dataset(DATA_DIR / 'train.csv')
+        _, vocabulary = attrition_analysis.preprocess_data(train_df, is_training=True)
+        test_df = attrition_analysis.read_dataset(DATA_DIR / 'test.csv').head(5)
+        expected, _ = attrition_analysis.preprocess_data(test_df, is_training=False, vocabulary=vocabulary)
+        
+        as_text = test_df.astype({'Age': object, 'MonthlyIncome': object})
+        as_text['Age'] = as_text['Age'].astype(str)
+        processed, used = attrition_analysis.preprocess_data(as_text, is_training=False, vocabulary=vocabulary)
+        np.testing.assert_array_equal(processed['Age'], expected['Age'])
+        assert used == {col: vocabulary[col] for col in vocabulary if col in test_df.columns}
+        
+        as_text.loc[as_text.index[0], 'Age'] = 'forty'
+        with pytest.raises(ValueError, match="'Age' must be numeric"):
+            attrition_analysis.preprocess_data(as_text, is_training=False, vocabulary=vocabulary)
+        
+        with pytest.raises(ValueError, match="'Nickname' holds text"):
+            attrition_analysis.preprocess_data(test_df.assign(Nickname='Sam'), is_training=False,
+                                               vocabulary=vocabulary)
+    
+    def test_vocabulary_codes_match_label_encoder(self):
+        """Test that the vectorized encoder reproduces LabelEncoder codes on the training data."""
+        train_df = attrition_analysis.read_dataset(DATA_DIR / 'train.csv')
+        processed, vocabulary = attrition_analysis.preprocess_data(train_df, is_training=True)
+        
+        for col in vocabulary:
+            expected = LabelEncoder().fit_transform(train_df[col].astype(str))
+            np.testing.assert_array_equal(processed[col].to_numpy(), expected)
+    
+    def test_incremental_retrain_adds_stages_and_records_history(self, trained_model, tmp_path):
+        """Test that warm-start retraining keeps existing stages, adds new ones and records lineage."""
+        model, X_train, X_val, y_train, y_val = trained_model
+        train_df = attrition_analysis.read_dataset(DATA_DIR / 'train.csv')
+        _, vocabulary = attrition_analysis.preprocess_data(train_df, is_training=True)
+        history = [attrition_analysis._training_record('full', model, 0, X_train, [DATA_DIR / 'train.csv'],
+                                                       val_accuracy=accuracy_score(y_val, model.predict(X_val)))]
+        path = attrition_analysis.save_pipeline(model, vocabulary, X_train.columns,
+                                                tmp_path / 'pipeline.joblib', training_history=history)
+        new_data = tmp_path / 'new_month.csv'
+        pd.read_csv(DATA_DIR / 'train.csv').sample(400, random_state=7).to_csv(new_data, index=False)
+        
+        evaluation = attrition_analysis.retrain(new_data, extra_stages=10, artifact_path=path)
+        artifact = attrition_analysis.load_pipeline(path)
+        updated = artifact['model']
+        
+        assert updated.n_estimators_ > model.n_estimators_
+        np.testing.assert_array_equal(updated.estimators_[0][0].tree_.value, model.estimators_[0][0].tree_.value)
+        assert [record['mode'] for record in artifact['training_history']] == ['full', 'incremental']
+        assert artifact['training_history'][1]['stages'] == [model.n_estimators_, updated.n_estimators_]
+        assert artifact['training_history'][1]['sources'] == [str(new_data)]
+        assert {'previous_accuracy', 'updated_accuracy', 'rebuild_recommended'} <= set(evaluation)
+    
+    def test_retrain_without_history_takes_current_stages_as_baseline(self, trained_model, tmp_path):
+        """Test that an artifact with no full-training record is not counted as entirely incremental."""
+        model, X_train, _, _, _ = trained_model
+        train_df = attrition_analysis.read_dataset(DATA_DIR / 'train.csv')
+        _, vocabulary = attrition_analysis.preprocess_data(train_df, is_training=True)
+        path = attrition_analysis.save_pipeline(model, vocabulary, X_train.columns, tmp_path / 'pipeline.joblib')
+        new_data = tmp_path / 'new_month.csv'
+        pd.read_csv(DATA_DIR / 'train.csv').sample(400, random_state=7).to_csv(new_data, index=False)
+        
+        evaluation = attrition_analysis.retrain(new_data, extra_stages=10, artifact_path=path)
+        history = attrition_analysis.load_pipeline(path)['training_history']
+        
+        assert evaluation['incremental_stage_fraction'] == pytest.approx(10 / (model.n_estimators_ + 10))
+        assert evaluation['reference_accuracy'] is None
+        assert [record['mode'] for record in history] == ['full', 'incremental']
+        assert history[0]['stages'] == [0, model.n_estimators_] and history[0]['inferred']
+        
+        second = attrition_analysis.retrain(new_data, extra_stages=10, artifact_path=path)
+        assert second['incremental_stage_fraction'] == pytest.approx(20 / (model.n_estimators_ + 20))
+    
+    def test_load_rejects_other_artifact_versions(self, tmp_path):
+        """Test that artifacts from another layout version are refused."""
+        import joblib
+        path = tmp_path / 'old.joblib'
+        joblib.dump({'artifact_version': attrition_analysis.ARTIFACT_VERSION + 1}, path)
+        
+        with pytest.raises(ValueError):
+            attrition_analysis.load_pipeline(path)
+
+
+class TestShardedScoring:
+    """Test suite for process-sharded batch scoring."""
+    
+    def test_shards_tile_the_data_rows(self):
+        """Test that shard boundaries fall on line starts and the shards cover every data row once."""
+        path = DATA_DIR / 'test.csv'
+        columns, shards = attrition_analysis._csv_shards(path, shard_bytes=1000)
+        data = path.read_bytes()
+        header_end = data.index(b'\n') + 1
+        
+        assert columns == pd.read_csv(path, nrows=0).columns.tolist()
+        assert len(shards) > 2
+        assert shards[0][0] == header_end and shards[-1][1] == len(data)
+        assert all(stop == next_start for (_, stop), (next_start, _) in zip(shards, shards[1:]))
+        assert all(data[start - 1:start] == b'\n' for start, _ in shards)
+    
+    @pytest.mark.parametrize('engine', attrition_analysis.MODEL_ENGINES)
+    def test_output_matches_streaming_in_row_order(self, training_data, trained_model, hist_model, engine,
+                                                   tmp_path, monkeypatch, capsys):
+        """Test that sharded scoring across workers reproduces single-process streaming output."""
+        vocabulary, X_train, *_ = training_data
+        model = trained_model[0] if engine == 'gradient_boosting' else hist_model[0]
+        path = attrition_analysis.save_pipeline(model, vocabulary, X_train.columns, tmp_path / 'pipeline.joblib')
+        monkeypatch.setattr(attrition_analysis, 'SCORE_MIN_SHARD_BYTES', 4096)
+        
+        rows = attrition_analysis.score_sharded(DATA_DIR / 'test.csv', tmp_path / 'sharded.csv', path, n_jobs=2)
+        assert "across 2 worker processes" in capsys.readouterr().out
+        streamed = attrition_analysis.score_stream(DATA_DIR / 'test.csv', tmp_path / 'streamed.csv', path,
+                                                   chunksize=50)
+        
+        assert rows == streamed
+        assert (tmp_path / 'sharded.csv').read_bytes() == (tmp_path / 'streamed.csv').read_bytes()
+    
+    def test_worker_scores_from_memory_mapped_artifact(self, training_data, hist_model, tmp_path):
+        """Test that a worker's model arrays are memory-mapped and still score correctly."""
+        vocabulary, X_train, *_ = training_data
+        path = attrition_analysis.save_pipeline(hist_model[0], vocabulary, X_train.columns,
+                                                tmp_path / 'pipeline.joblib')
+        attrition_analysis._init_shard_worker(path)
+        try:
+            model = attrition_analysis._shard_artifact['model']
+            columns, shards = attrition_analysis._csv_shards(DATA_DIR / 'test.csv')
+            rows, text = attrition_analysis._score_shard(DATA_DIR / 'test.csv', columns, *shards[0])
+        finally:
+            attrition_analysis._shard_thread_limits.restore_original_limits()
+        
+        expected = attrition_analysis.score(DATA_DIR / 'test.csv', artifact_path=path)
+        scored = pd.read_csv(io.StringIO(text), names=list(expected.columns))
+        
+        assert isinstance(model._predictors[0][0].nodes, np.memmap)
+        assert rows == len(expected)
+        np.testing.assert_allclose(scored['Attrition_Probability'], expected['Attrition_Probability'])
+    
+    def test_header_only_input(self, pipeline_artifact, tmp_path):
+        """Test that a file without data rows yields a header-only output."""
+        empty = tmp_path / 'empty.csv'
+        empty.write_text((DATA_DIR / 'test.csv').read_text().splitlines()[0] + '\n')
+        
+        assert attrition_analysis.score_sharded(empty, tmp_path / 'out.csv', pipeline_artifact) == 0
+        assert (tmp_path / 'out.csv').read_text() == "Predicted_Attrition,Attrition_Probability\n"
+
+
+class TestRunInstrumentation:
+    """Test suite for per-stage timing and the run manifest."""
+    
+    def test_stages_recorded_in_manifest(self, tmp_path):
+        """Test that each stage's timings and memory land in the manifest in run order."""
+        recorder = attrition_analysis.StageRecorder()
+        with recorder.stage('load'):
+            data = np.ones(2_000_000)
+        with recorder.stage('sum'):
+            data.sum()
+        
+        path = recorder.write_manifest(tmp_path / 'run_manifest.json', engine='gradient_boosting')
+        manifest = json.loads(path.read_text())
+        
+        assert manifest['engine'] == 'gradient_boosting'
+        assert [stage['stage'] for stage in manifest['stages']] == ['load', 'sum']
+        for stage in manifest['stages']:
+            assert stage['wall_seconds'] >= 0 and stage['cpu_seconds'] >= 0
+            assert stage['peak_rss_mb'] > 0
+            assert 'profile' not in stage
+    
+    def test_failed_stage_is_still_recorded(self):
+        """Test that a stage raising an exception is timed before the error propagates."""
+        recorder = attrition_analysis.StageRecorder()
+        with pytest.raises(RuntimeError):
+            with recorder.stage('broken'):
+                raise RuntimeError("boom")
+        assert recorder.stages[0]['stage'] == 'broken'
+    
+    def test_profile_dump_per_stage(self, tmp_path):
+        """Test that profiling writes a loadable cProfile dump for each stage."""
+        import pstats
+        recorder = attrition_analysis.StageRecorder(profile=True, profile_dir=tmp_path)
+        with recorder.stage('explore'):
+            attrition_analysis.explore_dataset(attrition_analysis.read_dataset(DATA_DIR / 'test.csv'), "Test")
+        
+        profile_path = Path(recorder.stages[0]['profile'])
+        assert profile_path == tmp_path / 'explore.prof'
+        assert pstats.Stats(str(profile_path)).total_calls > 0
+    
+    def test_output_writer_overlaps_main_flow(self):
+        """Test that submitted tasks run off the main thread as background stages and return in order."""
+        import threading
+        recorder = attrition_analysis.StageRecorder(profile=True)
+        writer = attrition_analysis.OutputWriter(recorder)
+        released = threading.Event()
+        writer.submit('blocked', released.wait, 10)
+        writer.submit('thread', lambda: threading.current_thread().name)
+        
+        # The main thread keeps running stages while the first task is still blocked
+        with recorder.stage('main'):
+            released.set()
+        results = writer.wait()
+        
+        assert results[0] is True and results[1].startswith('report')
+        stages = {stage['stage']: stage for stage in recorder.stages}
+        assert stages['blocked']['background'] and stages['thread']['background']
+        assert 'background' not in stages['main'] and 'profile' not in stages['blocked']
+        assert '* ran in the background' in recorder.summary()
+    
+    def test_output_writer_holds_back_task_output(self, capsys):
+        """Test that background tasks' prints come out at wait(), after the main thread's, in order."""
+        import threading
+        released = threading.Event()
+        
+        def task(label):
+            print(f"{label} start")
+            released.wait(10)
+            print(f"{label} end")
+        
+        with attrition_analysis.OutputWriter(attrition_analysis.StageRecorder()) as writer:
+            writer.submit('first', task, 'first')
+            writer.submit('second', task, 'second')
+            print("main")
+            released.set()
+            writer.wait()
+        
+        assert capsys.readouterr().out == "main\nfirst start\nfirst end\nsecond start\nsecond end\n"
+        assert not isinstance(sys.stdout, attrition_analysis._ThreadBufferedStdout)
+    
+    def test_output_writer_restores_stdout_when_main_flow_fails(self, capsys):
+        """Test that an error in the with block still restores stdout and prints finished tasks' output."""
+        with pytest.raises(RuntimeError, match="stage failed"):
+            with attrition_analysis.OutputWriter(attrition_analysis.StageRecorder()) as writer:
+                writer.submit('report', print, "report written").result()
+                raise RuntimeError("stage failed")
+        
+        assert not isinstance(sys.stdout, attrition_analysis._ThreadBufferedStdout)
+        assert capsys.readouterr().out == "report written\n"
+        assert writer.executor._shutdown
+    
+    def test_chart_workers_are_spawned(self):
+        """Test that chart pools never fork the multi-threaded parent."""
+        with attrition_analysis._chart_pool(max_workers=1) as pool:
+            assert pool._mp_context.get_start_method() == 'spawn'
+    
+    def test_output_writer_reraises_failure(self):
+        """Test that a failing task is recorded and its error surfaces from wait()."""
+        def broken():
+            raise OSError("disk full")
+        
+        recorder = attrition_analysis.StageRecorder()
+        writer = attrition_analysis.OutputWriter(recorder)
+        writer.submit('broken', broken)
+        with pytest.raises(OSError, match="disk full"):
+            writer.wait()
+        assert recorder.stages[0]['stage'] == 'broken'
+    
+    def test_predictions_csv_written_independently_of_report(self, tmp_path, monkeypatch):
+        """Test that the prediction report no longer writes the CSV and write_test_predictions does."""
+        monkeypatch.setattr(attrition_analysis, 'REPORT_DIR', tmp_path)
+        test_df = attrition_analysis.read_dataset(DATA_DIR / 'test.csv').head(4)
+        predictions = ['Yes', 'No', 'No', 'Yes']
+        proba = np.array([[0.2, 0.8], [0.9, 0.1], [0.7, 0.3], [0.4, 0.6]])
+        
+        attrition_analysis.generate_attrition_report(test_df, predictions, proba)
+        assert (tmp_path / 'ATTRITION-REPORT.md').exists()
+        assert not (tmp_path / 'test_predictions.csv').exists()
+        
+        path = attrition_analysis.write_test_predictions(predictions, proba)
+        written = pd.read_csv(path)
+        assert path == tmp_path / 'test_predictions.csv'
+        assert list(written.columns) == ['Predicted_Attrition', 'Attrition_Probability']
+        assert written['Predicted_Attrition'].tolist() == predictions
+        np.testing.assert_allclose(written['Attrition_Probability'], proba[:, 1])
+
+
+
+class TestChunkedSMOTE:
+    """Test suite for the memory-bounded SMOTE engine."""
+    
+    @staticmethod
+    def _max_neighbor_distance(minority, k):
+        from sklearn.neighbors import NearestNeighbors
+        distances, _ = NearestNeighbors(n_neighbors=k + 1).fit(minority).kneighbors(minority)
+        return distances[:, -1].max()
+    
+    def test_balances_classes_with_interpolated_minority_rows(self, load_training_data):
+        """Test that the output is balanced, keeps the original rows and interpolates between neighbours."""
+        from sklearn.neighbors import NearestNeighbors
+        X_train, X_val, y_train, y_val = load_training_data
+        X_resampled, y_resampled = attrition_analysis.ChunkedSMOTE(chunk_rows=100).fit_resample(X_train, y_train)
+        
+        assert list(X_resampled.columns) == list(X_train.columns)
+        assert (y_resampled == 0).sum() == (y_resampled == 1).sum() == (y_train == 0).sum()
+        np.testing.assert_allclose(X_resampled.to_numpy()[:len(X_train)], X_train.to_numpy(np.float32))
+        
+        # A point between a row and its k-th nearest neighbour is no further
+        # from the minority class than the largest k-th neighbour distance
+        minority = X_train.to_numpy(np.float32)[y_train.to_numpy() == 1]
+        synthetic = X_resampled.to_numpy()[len(X_train):]
+        nearest, _ = NearestNeighbors(n_neighbors=1).fit(minority).kneighbors(synthetic)
+        assert nearest.max() <= self._max_neighbor_distance(minority, 5) * (1 + 1e-5)
+    
+    def test_streams_bounded_batches(self, load_training_data):
+        """Test that iter_resample yields batches of at most chunk_rows that add up to fit_resample."""
+        X_train, X_val, y_train, y_val = load_training_data
+        smote = attrition_analysis.ChunkedSMOTE(chunk_rows=64)
+        batches = list(smote.iter_resample(X_train, y_train))
+        X_resampled, y_resampled = smote.fit_resample(X_train, y_train)
+        
+        assert max(len(X_batch) for X_batch, _ in batches) == 64
+        np.testing.assert_array_equal(np.vstack([X_batch for X_batch, _ in batches]), X_resampled.to_numpy())
+        np.testing.assert_array_equal(np.concatenate([y_batch for _, y_batch in batches]), y_resampled)
+    
+    def test_output_can_live_on_disk(self, load_training_data, tmp_path):
+        """Test that out_dir puts the balanced matrix in a memmap the returned frame shares."""
+        X_train, X_val, y_train, y_val = load_training_data
+        X_resampled, _ = attrition_analysis.ChunkedSMOTE().fit_resample(X_train, y_train, out_dir=tmp_path)
+        
+        on_disk = np.load(tmp_path / 'X_resampled.npy', mmap_mode='r')
+        np.testing.assert_array_equal(on_disk, X_resampled.to_numpy())
+    
+    def test_approximate_neighbors_recall(self, load_training_data):
+        """Test that random-projection tree neighbours mostly agree with the exact ones."""
+        X_train, X_val, y_train, y_val = load_training_data
+        minority = X_train.to_numpy(np.float32)[y_train.to_numpy() == 1]
+        smote = attrition_analysis.ChunkedSMOTE(leaf_rows=32)
+        
+        exact = smote._exact_neighbors(minority)
+        approximate = smote._approximate_neighbors(minority, np.random.default_rng(0))
+        recall = np.mean([len(set(e) & set(a)) / len(e) for e, a in zip(exact, approximate)])
+        assert recall > 0.5
+    
+    def test_categorical_columns_take_neighbour_values(self, load_training_data):
+        """Test that categorical columns are copied from neighbours rather than interpolated."""
+        X_train, X_val, y_train, y_val = load_training_data
+        mask = [col in ('Department', 'JobRole') for col in X_train.columns]
+        X_resampled, _ = attrition_analysis.ChunkedSMOTE(categorical_mask=mask).fit_resample(X_train, y_train)
+        
+        for col in ('Department', 'JobRole'):
+            assert set(X_resampled[col].unique()) <= set(X_train[col].unique())
+    
+    @pytest.mark.parametrize('smote', ['chunked', 'approximate'])
+    def test_model_trained_with_chunked_smote(self, load_training_data, smote):
+        """Test that the chunked engines train a model as accurate as the default one."""
+        X_train, X_val, y_train, y_val = load_training_data
+        model = attrition_analysis.build_model(X_train, y_train, smote=smote)
+        
+        assert accuracy_score(y_val, model.predict(X_val)) >= 0.80
+        assert list(model.feature_names_in_) == list(X_train.columns)
+
+class TestImbalanceStrategies:
+    """Test suite for weight- and undersampling-based class balancing."""
+    
+    def test_weights_balance_classes_on_original_rows(self, load_training_data):
+        """Test that class weights give both classes equal total weight without adding rows."""
+        X_train, X_val, y_train, y_val = load_training_data
+        X_fit, y_fit, weight = attrition_analysis._balance_training_data(X_train, y_train, 'gradient_boosting',
+                                                                         [], imbalance='weights')
+        
+        assert X_fit is X_train and len(weight) == len(y_train)
+        assert weight[y_train.to_numpy() == 1].sum() == pytest.approx(weight[y_train.to_numpy() == 0].sum())
+        assert weight.sum() == pytest.approx(len(y_train))
+    
+    def test_undersampling_shrinks_majority_to_minority(self, load_training_data):
+        """Test that undersampling keeps every minority row and as many majority rows."""
+        X_train, X_val, y_train, y_val = load_training_data
+        X_fit, y_fit, weight = attrition_analysis._balance_training_data(X_train, y_train, 'gradient_boosting',
+                                                                         [], imbalance='undersample')
+        
+        assert weight is None
+        assert (y_fit == 0).sum() == (y_fit == 1).sum() == (y_train == 1).sum()
+    
+    def test_unknown_strategy_rejected(self, load_training_data):
+        """Test that an unsupported imbalance strategy raises a clear error."""
+        X_train, X_val, y_train, y_val = load_training_data
+        with pytest.raises(ValueError, match="imbalance must be one of"):
+            attrition_analysis.build_model(X_train, y_train, imbalance='oversample')
+    
+    @pytest.mark.parametrize('imbalance', ['weights', 'undersample'])
+    def test_strategy_and_cost_recorded(self, load_training_data, imbalance, tmp_path, monkeypatch):
+        """Test that the model records its strategy and cost and the model report shows them."""
+        X_train, X_val, y_train, y_val = load_training_data
+        model = attrition_analysis.build_model(X_train, y_train, imbalance=imbalance)
+        
+        assert model.imbalance_['strategy'] == imbalance
+        assert model.imbalance_['training_rows'] == len(y_train)
+        assert model.imbalance_['fit_rows'] <= len(y_train)
+        assert accuracy_score(y_val, model.predict(X_val)) >= 0.80
+        
+        monkeypatch.setattr(attrition_analysis, 'REPORT_DIR', tmp_path)
+        monkeypatch.setattr(attrition_analysis, 'CV_FOLDS', 3)
+        model_results = attrition_analysis.evaluate_model(model, X_train, y_train, X_val, y_val,
+                                                          plot_charts=False, cv_jobs=1)
+        model_results.update(training_samples=len(X_train), engine='gradient_boosting',
+                             imbalance=model.imbalance_)
+        attrition_analysis.generate_attrition_model_report(model_results)
+        
+        report = (tmp_path / 'ATTRITION-MODEL.md').read_text()
+        assert f"**Class Imbalance Strategy**: `{imbalance}`" in report
+        assert f"| {len(y_train):,} | {model.imbalance_['fit_rows']:,} |" in report
+
+
+@pytest.fixture(scope="module")
+def split_csv(tmp_path_factory):
+    """The raw training split written to CSV, and the raw validation rows."""
+    train_df = attrition_analysis.read_dataset(DATA_DIR / 'train.csv')
+    fit_df, val_df = train_test_split(train_df, test_size=0.2, random_state=42, stratify=train_df['Attrition'])
+    path = tmp_path_factory.mktemp('out-of-core') / 'train.csv'
+    fit_df.to_csv(path, index=False)
+    return path, val_df
+
+
+class TestOutOfCoreTraining:
+    """Test suite for two-pass streaming training from on-disk binned data."""
+    
+    def test_scan_matches_in_memory_preprocessing(self, split_csv):
+        """Test that the chunked scan finds the full vocabulary, feature order and class counts."""
+        path, _ = split_csv
+        scan = attrition_analysis._scan_training_data(path, chunksize=100)
+        processed, vocabulary = attrition_analysis.preprocess_data(
+            attrition_analysis.read_dataset(path, use_cache=False), is_training=True)
+        
+        assert scan['vocabulary'] == vocabulary
+        assert scan['feature_columns'] == [col for col in processed.columns if col != 'Attrition']
+        assert scan['rows'] == len(processed)
+        assert scan['class_counts'].tolist() == np.bincount(processed['Attrition']).tolist()
+        assert all(len(t) < attrition_analysis.OUT_OF_CORE_MAX_BINS for t in scan['bin_thresholds'])
+    
+    def test_raw_thresholds_reproduce_binned_training(self, split_csv, tmp_path):
+        """Test that the fitted trees score raw rows exactly as training routed their bins."""
+        path, _ = split_csv
+        scan = attrition_analysis._scan_training_data(path, chunksize=200)
+        X_binned, y = attrition_analysis._write_binned_data(path, scan, tmp_path, chunksize=200)
+        model = attrition_analysis.BinnedGradientBoosting(max_iter=30, block_rows=128)
+        model.fit(X_binned, y, scan['bin_thresholds'], work_dir=tmp_path)
+        
+        processed, _ = attrition_analysis.preprocess_data(
+            attrition_analysis.read_dataset(path, use_cache=False), is_training=True,
+            vocabulary=scan['vocabulary'])
+        # Raw scores the booster tracked for every training row while fitting
+        np.testing.assert_allclose(model.decision_function(processed[scan['feature_columns']]),
+                                   np.load(tmp_path / 'raw.npy'), rtol=0, atol=1e-12)
+        assert model.n_iter_ == 30 and len(model.validation_loss_) == 30
+        assert model.validation_loss_[-1] < model.validation_loss_[0]
+    
+    def test_chunk_size_does_not_change_model(self, split_csv, tmp_path):
+        """Test that the CSV chunk size changes neither the bins nor the fitted model."""
+        path, val_df = split_csv
+        probabilities = []
+        for chunksize in (150, 100_000):
+            artifact_path = attrition_analysis.train_out_of_core(path, tmp_path / f'{chunksize}.joblib',
+                                                                 chunksize=chunksize, params={'max_iter': 20})
+            results = attrition_analysis.score(path, artifact_path=artifact_path)
+            probabilities.append(results['Attrition_Probability'])
+        
+        np.testing.assert_array_equal(*probabilities)
+    
+    def test_yes_no_labels_train_the_same_model(self, split_csv, tmp_path):
+        """Test that a CSV labelled Yes/No streams through and fits the same model as 0/1 labels."""
+        path, val_df = split_csv
+        labelled_path = tmp_path / 'yes_no.csv'
+        labelled = pd.read_csv(path)
+        labelled['Attrition'] = labelled['Attrition'].map({1: 'Yes', 0: 'No'})
+        labelled.to_csv(labelled_path, index=False)
+        
+        scan = attrition_analysis._scan_training_data(labelled_path, chunksize=150)
+        assert scan['class_counts'].tolist() == np.bincount(pd.read_csv(path)['Attrition']).tolist()
+        probabilities = []
+        for source in (path, labelled_path):
+            artifact_path = attrition_analysis.train_out_of_core(source, tmp_path / f'{source.stem}.joblib',
+                                                                 chunksize=150, params={'max_iter': 20})
+            probabilities.append(attrition_analysis.score(path, artifact_path=artifact_path)['Attrition_Probability'])
+        
+        np.testing.assert_array_equal(*probabilities)
+    
+    def test_unknown_labels_are_rejected(self, split_csv, tmp_path):
+        """Test that labels other than 0/1 or Yes/No fail the scan with a clear error."""
+        path, _ = split_csv
+        bad_path = tmp_path / 'bad.csv'
+        labelled = pd.read_csv(path)
+        labelled['Attrition'] = labelled['Attrition'].map({1: 'Left', 0: 'Stayed'})
+        labelled.to_csv(bad_path, index=False)
+        
+        with pytest.raises(ValueError, match="0/1 or Yes/No"):
+            attrition_analysis._scan_training_data(bad_path)
+    
+    def test_artifact_scores_and_refuses_incremental_retrain(self, split_csv, tmp_path):
+        """Test that the artifact scores held-out rows accurately and rejects warm-start retraining."""
+        path, val_df = split_csv
+        artifact_path = attrition_analysis.train_out_of_core(path, tmp_path / 'pipeline.joblib')
+        val_path = tmp_path / 'val.csv'
+        val_df.to_csv(val_path, index=False)
+        
+        results = attrition_analysis.score(val_path, artifact_path=artifact_path)
+        record = json.loads(val_df.head(1).to_json(orient='records'))[0]
+        artifact = attrition_analysis.load_pipeline(artifact_path)
+        
+        assert accuracy_score(val_df['Attrition'], results['Predicted_Attrition'] == 'Yes') >= 0.85
+        assert attrition_analysis.predict_one(record, artifact_path) == results['Attrition_Probability'][0]
+        assert artifact['training_history'][0]['mode'] == 'out_of_core'
+        assert artifact['model'].imbalance_['strategy'] == 'weights'
+        with pytest.raises(ValueError, match="out-of-core"):
+            attrition_analysis.retrain(val_path, artifact_path=artifact_path)
+
+
+class TestHyperparameterSearch:
+    """Test suite for successive-halving tuning and its trial cache."""
+    
+    @staticmethod
+    def _tune(tmp_path, **kwargs):
+        options = dict(n_candidates=4, factor=2, max_stages=8, folds=2, n_jobs=1,
+                       cache_dir=tmp_path / 'trials', output_path=tmp_path / 'tuned_params.json')
+        return attrition_analysis.tune(**{**options, **kwargs})
+    
+    def test_rounds_halve_candidates_and_grow_stages(self, tmp_path):
+        """Test that each round keeps the best 1/factor of candidates with factor times more stages."""
+        result = self._tune(tmp_path)
+        
+        assert [len(r['candidates']) for r in result['rounds']] == [4, 2, 1]
+        assert [r['stages'] for r in result['rounds']] == [2, 4, 8]
+        assert result['params'] == {**result['rounds'][-1]['candidates'][0]['params'], 'n_estimators': 8}
+        survivors = [c['params'] for c in result['rounds'][0]['candidates'][:2]]
+        assert [c['params'] for c in result['rounds'][1]['candidates']] in (survivors, survivors[::-1])
+        assert json.loads((tmp_path / 'tuned_params.json').read_text())['params'] == result['params']
+    
+    def test_search_resumes_from_cached_trials(self, tmp_path):
+        """Test that a rerun fits only the trials missing from the cache and gives the same result."""
+        first = self._tune(tmp_path)
+        trials = sorted((tmp_path / 'trials').glob('*.json'))
+        assert len(trials) == (4 + 2 + 1) * 2
+        modified = {path: path.stat().st_mtime_ns for path in trials}
+        
+        # Simulate an interruption that lost one trial
+        trials[0].unlink()
+        second = self._tune(tmp_path)
+        
+        assert second == first
+        assert all(path.stat().st_mtime_ns == modified[path] for path in trials[1:])
+        assert trials[0].exists()
+    
+    def test_tuned_params_override_defaults(self):
+        """Test that build_model's estimator takes tuned parameters over its defaults."""
+        model = attrition_analysis._make_estimator('gradient_boosting', [], {'max_depth': 2, 'n_estimators': 40})
+        assert (model.max_depth, model.n_estimators, model.learning_rate) == (2, 40, 0.05)
+
+def _stage_function_a():
+    return 1
+
+
+def _stage_function_b():
+    return 2
+
+
+class TestStageCache:
+    """Test suite for content-addressed stage caching."""
+    
+    def test_round_trip_restores_value_and_files(self, tmp_path):
+        """Test that a hit returns the stored value and copies the stage's files back."""
+        cache = attrition_analysis.StageCache(tmp_path / 'cache')
+        output = tmp_path / 'media' / 'chart.png'
+        output.parent.mkdir()
+        output.write_bytes(b'chart')
+        
+        key = cache.key('charts', data=[DATA_DIR / 'train.csv'], code=[_stage_function_a], dpi=150)
+        assert cache.load('charts', key) == (False, None)
+        cache.save('charts', key, {'rows': 3}, files=[output])
+        
+        output.unlink()
+        assert cache.load('charts', key) == (True, {'rows': 3})
+        assert output.read_bytes() == b'chart'
+    
+    def test_key_tracks_data_code_and_params(self, tmp_path):
+        """Test that changing any input file, function or parameter changes the key."""
+        cache = attrition_analysis.StageCache(tmp_path / 'cache')
+        data = tmp_path / 'train.csv'
+        data.write_text('a,b\n1,2\n')
+        base = cache.key('model', data=[data], code=[_stage_function_a], engine='gradient_boosting')
+        
+        assert cache.key('model', data=[data], code=[_stage_function_a], engine='gradient_boosting') == base
+        assert cache.key('model', data=[data], code=[_stage_function_b], engine='gradient_boosting') != base
+        assert cache.key('model', data=[data], code=[_stage_function_a], engine='hist_gradient_boosting') != base
+        assert cache.key('charts', data=[data], code=[_stage_function_a], engine='gradient_boosting') != base
+        data.write_text('a,b\n1,3\n')
+        assert cache.key('model', data=[data], code=[_stage_function_a], engine='gradient_boosting') != base
+    
+    @pytest.mark.parametrize('name, value', [
+        ('DATASET_SCHEMA', {**attrition_analysis.DATASET_SCHEMA, 'Age': 'int32'}),
+        ('CSV_ENGINE', 'python'),
+        ('SMOTE_CHUNKED_MIN_ROWS', 1_000),
+    ])
+    def test_model_key_tracks_module_settings(self, tmp_path, monkeypatch, name, value):
+        """Test that the model stage's key changes with the schema, CSV engine and SMOTE thresholds."""
+        cache = attrition_analysis.StageCache(tmp_path / 'cache')
+        
+        def model_key():
+            return cache.key('model', code=attrition_analysis._model_stage_code(False),
+                             settings=attrition_analysis._model_stage_settings())
+        
+        base = model_key()
+        monkeypatch.setattr(attrition_analysis, name, value)
+        assert model_key() != base
+        assert attrition_analysis.read_dataset in attrition_analysis._model_stage_code(False)
+    
+    def test_old_entries_pruned(self, tmp_path, monkeypatch):
+        """Test that each stage keeps only its most recently used entries."""
+        monkeypatch.setattr(attrition_analysis, 'STAGE_CACHE_ENTRIES', 2)
+        cache = attrition_analysis.StageCache(tmp_path / 'cache')
+        for i in range(4):
+            cache.save('model', f'key{i}', i)
+        
+        assert cache.load('model', 'key0') == (False, None)
+        assert cache.load('model', 'key3') == (True, 3)
+        assert len(list((tmp_path / 'cache' / 'model').iterdir())) == 2
+    
+    def test_disabled_cache_never_hits(self, tmp_path):
+        """Test that a disabled cache neither stores nor returns entries."""
+        cache = attrition_analysis.StageCache(tmp_path / 'cache', enabled=False)
+        cache.save('model', 'key', 1)
+        assert cache.load('model', 'key') == (False, None)
+        assert not (tmp_path / 'cache').exists()
+
+class TestStartupCost:
+    """Test suite guarding the import-time cost of the analysis module."""
+    
+    @staticmethod
+    def _cold_import():
+        """Import attrition_analysis in a fresh interpreter; return (seconds, heavy modules loaded)."""
+        code = (
+            "import sys, time\n"
+            "start = time.perf_counter()\n"
+            "import attrition_analysis\n"
+            "elapsed = time.perf_counter() - start\n"
+            "heavy = [m for m in ('matplotlib', 'seaborn', 'imblearn', 'sklearn') if m in sys.modules]\n"
+            "print(elapsed, ','.join(heavy))\n"
+        )
+        output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                                check=True, cwd=Path(__file__).parent).stdout.split()
+        return float(output[0]), output[1:]
+    
+    def test_import_does_not_load_plotting_or_training_stacks(self):
+        """Test that importing the module leaves matplotlib, seaborn, imblearn and sklearn unloaded."""
+        _, heavy = self._cold_import()
+        assert heavy == [], f"Heavy modules loaded at import time: {heavy}"
+    
+    def test_import_time_within_budget(self):
+        """Test that a cold import stays within the import-time budget."""
+        elapsed = min(self._cold_import()[0] for _ in range(3))
+        print(f"\nCold import time: {elapsed:.3f}s (budget {IMPORT_TIME_BUDGET_SECONDS}s)")
+        assert elapsed <= IMPORT_TIME_BUDGET_SECONDS, (
+            f"Importing attrition_analysis took {elapsed:.3f}s, over the "
+            f"{IMPORT_TIME_BUDGET_SECONDS}s budget"
+        )
+
+
 def run_accuracy_validation():
     """
     Standalone function to validate model accuracy.
@@ -245,9 +1204,9 @@ def run_accuracy_validation():
     print("STANDALONE ACCURACY VALIDATION")
     print("="*80)
     
-    # Load data
-    train_df = pd.read_csv(DATA_DIR / 'train.csv')
-    train_processed = preprocess_data_for_test(train_df, is_training=True)
+    # Load and preprocess data exactly as the pipeline does
+    train_df = attrition_analysis.read_dataset(DATA_DIR / 'train.csv')
+    train_processed, vocabulary = attrition_analysis.preprocess_data(train_df, is_training=True)
     
     X = train_processed.drop('Attrition', axis=1)
     y = train_processed['Attrition']
@@ -257,26 +1216,8 @@ def run_accuracy_validation():
         X, y, test_size=0.2, random_state=42, stratify=y
     )
     
-    # Apply SMOTE
-    smote = SMOTE(random_state=42, k_neighbors=5)
-    X_train_resampled, y_train_resampled = smote.fit_resample(X_train, y_train)
-    
-    # Train model
-    model = GradientBoostingClassifier(
-        n_estimators=300,
-        learning_rate=0.05,
-        max_depth=5,
-        min_samples_split=10,
-        min_samples_leaf=5,
-        subsample=0.8,
-        random_state=42,
-        max_features='sqrt',
-        validation_fraction=0.1,
-        n_iter_no_change=20,
-        tol=0.0001
-    )
-    
-    model.fit(X_train_resampled, y_train_resampled)
+    # Train model (SMOTE + gradient boosting)
+    model = attrition_analysis.build_model(X_train, y_train, categorical_columns=list(vocabulary))
     
     # Evaluate
     y_pred = model.predict(X_val)
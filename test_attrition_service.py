@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Test Suite for the Attrition Scoring Service
+
+Validates that micro-batched online predictions match batch scoring and that
+the HTTP API serves single records and record lists.
+"""
+
+import json
+import threading
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+import numpy as np
+import warnings
+warnings.filterwarnings('ignore')
+
+import attrition_analysis
+import attrition_service
+
+
+DATA_DIR = Path('/tmp/employee-data')
+
+
+@pytest.fixture(scope="module")
+def artifact_path(pipeline_artifact):
+    """The shared trained pipeline artifact (see conftest.py)."""
+    return pipeline_artifact
+
+
+@pytest.fixture(scope="module")
+def test_records():
+    """Test employees as JSON-style records, with batch-scored expectations."""
+    test_df = attrition_analysis.read_dataset(DATA_DIR / 'test.csv').head(40)
+    records = json.loads(test_df.to_json(orient='records'))
+    return records, test_df
+
+
+@pytest.fixture
+def server(artifact_path):
+    """A scoring server on an ephemeral port, running in a background thread."""
+    server = attrition_service.create_server(artifact_path, port=0, max_wait_ms=20)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    server.batcher.close()
+
+
+def _post(server, body):
+    request = urllib.request.Request(
+        f"http://127.0.0.1:{server.server_port}/predict",
+        data=json.dumps(body).encode(), headers={'Content-Type': 'application/json'}
+    )
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read())
+
+
+class TestMicroBatcher:
+    """Test suite for request micro-batching."""
+    
+    def test_concurrent_requests_are_coalesced(self, artifact_path, test_records):
+        """Test that concurrent single-record requests are scored in shared batches."""
+        records, _ = test_records
+        batcher = attrition_service.MicroBatcher(attrition_analysis.load_pipeline(artifact_path),
+                                                 max_batch_size=16, max_wait_ms=50)
+        try:
+            futures = [batcher.submit(record) for record in records]
+            results = [future.result(timeout=10) for future in futures]
+        finally:
+            batcher.close()
+        
+        assert len(results) == len(records)
+        assert batcher.batched_records == len(records)
+        assert batcher.batch_count < len(records)
+        assert 1 < batcher.largest_batch <= 16
+    
+    def test_batched_predictions_match_batch_scoring(self, artifact_path, test_records):
+        """Test that micro-batched predictions equal scoring the same rows as one frame."""
+        records, test_df = test_records
+        artifact = attrition_analysis.load_pipeline(artifact_path)
+        batcher = attrition_service.MicroBatcher(artifact)
+        try:
+            results = [batcher.submit(record).result(timeout=10) for record in records]
+        finally:
+            batcher.close()
+        
+        processed, _ = attrition_analysis.preprocess_data(test_df, is_training=False,
+                                                          vocabulary=artifact['vocabulary'])
+        processed = attrition_analysis.align_features(processed, artifact['feature_columns'])
+        expected = artifact['model'].predict_proba(processed)[:, 1]
+        
+        np.testing.assert_allclose([r['attrition_probability'] for r in results], expected)
+    
+    def test_large_record_lists_use_the_sklearn_model(self, artifact_path, test_records, monkeypatch):
+        """Test that lists beyond COMPILED_MAX_ROWS bypass the compiled ensemble with the same results."""
+        records, _ = test_records
+        batcher = attrition_service.MicroBatcher(attrition_analysis.load_pipeline(artifact_path))
+        try:
+            compiled = batcher.score_records(records)
+            monkeypatch.setattr(attrition_analysis, 'COMPILED_MAX_ROWS', len(records) - 1)
+            monkeypatch.setattr(batcher.model, 'predict_proba', None)
+            direct = batcher.score_records(records)
+        finally:
+            batcher.close()
+        
+        assert direct == compiled
+    
+    def test_compiled_engine_scores_the_feature_array(self, artifact_path, test_records, monkeypatch):
+        """Test that micro-batches reach the compiled ensemble as the encoded array, not a DataFrame."""
+        records, _ = test_records
+        batcher = attrition_service.MicroBatcher(attrition_analysis.load_pipeline(artifact_path))
+        inputs = []
+        predict_proba = batcher.model.predict_proba
+        monkeypatch.setattr(batcher.model, 'predict_proba', lambda X: inputs.append(X) or predict_proba(X))
+        try:
+            batcher.score_records(records[:8])
+        finally:
+            batcher.close()
+        
+        assert len(inputs) == 1 and isinstance(inputs[0], np.ndarray)
+        assert inputs[0].shape == (8, len(batcher.feature_columns))
+    
+    def test_malformed_record_fails_alone(self, artifact_path, test_records):
+        """Test that bad records in a micro-batch fail only their own request and leave the others unchanged."""
+        records, _ = test_records
+        artifact = attrition_analysis.load_pipeline(artifact_path)
+        scorer = attrition_analysis.RecordScorer(artifact)
+        missing_age = {key: value for key, value in records[0].items() if key != 'Age'}
+        text_age = {**records[1], 'Age': str(records[1]['Age'])}
+        null_age = {**records[2], 'Age': None}
+        bad_age = {**records[3], 'Age': 'forty'}
+        batch = [missing_age, text_age, null_age, bad_age] + records[4:8]
+        
+        batcher = attrition_service.MicroBatcher(artifact, max_wait_ms=200)
+        try:
+            futures = [batcher.submit(record) for record in batch]
+            with pytest.raises(ValueError, match="NaN"):
+                futures[2].result(timeout=10)
+            with pytest.raises(ValueError, match="'Age' must be numeric"):
+                futures[3].result(timeout=10)
+            scored = {i: futures[i].result(timeout=10) for i in (0, 1, 4, 5, 6, 7)}
+        finally:
+            batcher.close()
+        
+        assert batcher.batch_count == 1 and batcher.batched_records == len(batch)
+        for i, result in scored.items():
+            assert result['attrition_probability'] == scorer.predict_one(batch[i])
+        assert scored[1]['attrition_probability'] == scorer.predict_one(records[1])
+
+
+class TestScoringService:
+    """Test suite for the HTTP API."""
+    
+    def test_health(self, server):
+        """Test the health endpoint."""
+        url = f"http://127.0.0.1:{server.server_port}/health"
+        with urllib.request.urlopen(url) as response:
+            assert json.loads(response.read()) == {'status': 'ok'}
+    
+    def test_single_record_requests(self, server, test_records):
+        """Test concurrent single-record requests over HTTP."""
+        records, _ = test_records
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda record: _post(server, record), records))
+        
+        assert len(results) == len(records)
+        assert all(r['predicted_attrition'] in ('Yes', 'No') for r in results)
+        assert all(0 <= r['attrition_probability'] <= 1 for r in results)
+    
+    def test_record_list_request(self, server, test_records):
+        """Test that a list of records is scored in one request, in order."""
+        records, _ = test_records
+        batch = _post(server, records)
+        single = _post(server, records[3])
+        
+        assert len(batch) == len(records)
+        assert batch[3]['attrition_probability'] == pytest.approx(single['attrition_probability'])
+    
+    def test_invalid_body_rejected(self, server):
+        """Test that a non-record body is rejected with 400."""
+        with pytest.raises(urllib.error.HTTPError) as excinfo:
+            _post(server, 42)
+        assert excinfo.value.code == 400
+    
+    def test_unscoreable_records_reported_per_record(self, server, test_records):
+        """Test that a bad record is a 400 on its own and an error entry inside a list."""
+        records, _ = test_records
+        bad = {**records[0], 'MonthlyIncome': 'lots'}
+        with pytest.raises(urllib.error.HTTPError) as excinfo:
+            _post(server, bad)
+        assert excinfo.value.code == 400
+        
+        batch = _post(server, [records[1], bad, 'not a record', records[2]])
+        assert "'MonthlyIncome' must be numeric" in batch[1]['error']
+        assert 'error' in batch[2]
+        assert batch[3] == _post(server, records[2])
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Test Suite for the Stage-Level Benchmark Harness
+
+Validates synthetic dataset scaling and baseline regression gating.
+"""
+
+from pathlib import Path
+
+import pytest
+import warnings
+warnings.filterwarnings('ignore')
+
+import attrition_analysis
+import benchmark_attrition
+
+
+DATA_DIR = Path('/tmp/employee-data')
+
+
+def _stage(seconds, peak_mb):
+    return {'seconds': seconds, 'cpu_seconds': seconds, 'peak_mb': peak_mb}
+
+
+class TestSyntheticScaling:
+    """Test suite for benchmark dataset synthesis."""
+    
+    def test_scaled_dataset_keeps_schema_and_vocabulary(self):
+        """Test that a scaled dataset has the requested size, same columns and no new categories."""
+        train_df = attrition_analysis.read_dataset(DATA_DIR / 'train.csv')
+        scaled = benchmark_attrition.synthesize_dataset(train_df, 2.5)
+        
+        assert len(scaled) == round(len(train_df) * 2.5)
+        assert list(scaled.columns) == list(train_df.columns)
+        assert scaled['EmployeeNumber'].is_unique
+        for col in ['Department', 'JobRole', 'OverTime']:
+            assert set(scaled[col].astype(str)) <= set(train_df[col].astype(str))
+
+
+class TestMeasure:
+    """Test suite for per-stage measurement."""
+    
+    def test_timing_and_memory_come_from_separate_runs(self):
+        """Test that timed runs execute without tracemalloc and traced runs record only memory."""
+        import tracemalloc
+        results = {}
+        assert benchmark_attrition.measure(results, 'timed', tracemalloc.is_tracing) is False
+        assert benchmark_attrition.measure(results, 'traced', lambda: bytearray(4 << 20), trace=True)
+        
+        assert set(results['timed']) == {'seconds', 'cpu_seconds'}
+        assert set(results['traced']) == {'peak_mb'} and results['traced']['peak_mb'] >= 4
+        assert not tracemalloc.is_tracing()
+
+
+class TestBaselineGating:
+    """Test suite for regression detection against a stored baseline."""
+    
+    def test_slower_stage_is_flagged(self):
+        """Test that a stage beyond the time tolerance is reported."""
+        baseline = {'1': {'build_model': _stage(2.0, 50)}}
+        current = {'1': {'build_model': _stage(3.0, 50)}}
+        
+        regressions = benchmark_attrition.compare_to_baseline(current, baseline)
+        assert len(regressions) == 1
+        assert 'build_model' in regressions[0]
+    
+    def test_memory_growth_is_flagged(self):
+        """Test that a stage beyond the memory tolerance is reported."""
+        baseline = {'4': {'smote_resampling': _stage(1.0, 100)}}
+        current = {'4': {'smote_resampling': _stage(1.0, 200)}}
+        
+        assert len(benchmark_attrition.compare_to_baseline(current, baseline)) == 1
+    
+    @pytest.mark.parametrize('seconds, peak_mb', [(2.2, 55), (0.004, 0.5)])
+    def test_noise_within_tolerance_passes(self, seconds, peak_mb):
+        """Test that small relative or absolute differences do not fail the gate."""
+        baseline = {'1': {'build_model': _stage(2.0, 50), 'predict_test_data': _stage(0.001, 0.1)}}
+        current = {'1': {'build_model': _stage(seconds, peak_mb), 'predict_test_data': _stage(0.004, 0.5)}}
+        
+        assert benchmark_attrition.compare_to_baseline(current, baseline) == []
+    
+    def test_missing_baseline_fails_before_benchmarking(self, tmp_path, monkeypatch):
+        """Test that the gate exits non-zero without running anything when there is no baseline."""
+        def run_benchmarks(*args):
+            raise AssertionError("benchmarks ran without a baseline")
+        
+        monkeypatch.setattr(benchmark_attrition, 'run_benchmarks', run_benchmarks)
+        assert benchmark_attrition.main(['--baseline', str(tmp_path / 'missing.json')]) == 2
+    
+    def test_missing_baseline_can_be_allowed(self, tmp_path, monkeypatch):
+        """Test that --allow-missing-baseline measures and passes without gating."""
+        current = {'1': {'build_model': _stage(2.0, 50)}}
+        monkeypatch.setattr(benchmark_attrition, 'run_benchmarks', lambda *args: current)
+        
+        assert benchmark_attrition.main(['--baseline', str(tmp_path / 'missing.json'),
+                                         '--allow-missing-baseline']) == 0
+        assert not (tmp_path / 'missing.json').exists()
+    
+    def test_stages_missing_from_baseline_are_not_gated(self):
+        """Test that new stages or scales pass until a baseline records them."""
+        current = {'16': {'build_model': _stage(100.0, 1000)}}
+        assert benchmark_attrition.compare_to_baseline(current, {'1': {}}) == []
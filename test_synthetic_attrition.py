@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Test Suite for the Synthetic Data Generator
+
+Validates that synthetic employees keep the training data's schema,
+vocabularies, marginal distributions, correlations and attrition rate, and
+that streamed output is complete and reproducible.
+"""
+
+from pathlib import Path
+
+import pytest
+import numpy as np
+import warnings
+warnings.filterwarnings('ignore')
+
+import attrition_analysis
+from synthetic_attrition import SyntheticAttritionGenerator
+
+
+DATA_DIR = Path('/tmp/employee-data')
+
+
+@pytest.fixture(scope="module")
+def source():
+    """The real training data the generator is fitted to."""
+    return attrition_analysis.read_dataset(DATA_DIR / 'train.csv')
+
+
+@pytest.fixture(scope="module")
+def generator(source):
+    """A copula generator fitted to the training data."""
+    return SyntheticAttritionGenerator(source)
+
+
+@pytest.fixture(scope="module")
+def synthetic(generator):
+    """A large in-memory synthetic sample."""
+    return generator.sample(50_000, np.random.default_rng(0))
+
+
+class TestDistributionFidelity:
+    """Test suite for the statistical fidelity of generated data."""
+    
+    def test_schema_and_vocabularies_preserved(self, source, synthetic):
+        """Test that the columns match and categorical columns only use source categories."""
+        assert list(synthetic.columns) == list(source.columns)
+        assert synthetic['EmployeeNumber'].is_unique
+        for col in attrition_analysis._CATEGORICAL_COLUMNS:
+            assert set(synthetic[col].astype(str)) == set(source[col].astype(str))
+    
+    def test_attrition_rate_and_marginals_preserved(self, source, synthetic):
+        """Test that the attrition rate, numeric means and category shares match the source."""
+        assert synthetic['Attrition'].mean() == pytest.approx(source['Attrition'].mean(), abs=0.01)
+        for col in ['Age', 'MonthlyIncome', 'TotalWorkingYears', 'JobSatisfaction']:
+            assert synthetic[col].mean() == pytest.approx(source[col].mean(), rel=0.02)
+            assert synthetic[col].min() >= source[col].min() and synthetic[col].max() <= source[col].max()
+        
+        shares = synthetic['Department'].astype(str).value_counts(normalize=True)
+        expected = source['Department'].astype(str).value_counts(normalize=True)
+        np.testing.assert_allclose(shares[expected.index], expected, atol=0.01)
+    
+    def test_rank_correlations_preserved(self, source, synthetic):
+        """Test that rank correlations between numeric columns, including with Attrition, are kept."""
+        columns = ['Attrition', 'Age', 'MonthlyIncome', 'JobLevel', 'TotalWorkingYears',
+                   'YearsAtCompany', 'JobSatisfaction']
+        difference = synthetic[columns].corr('spearman') - source[columns].corr('spearman')
+        assert np.abs(difference.to_numpy()).max() < 0.05
+    
+    def test_output_preprocesses_like_real_data(self, source, synthetic):
+        """Test that synthetic rows go through preprocess_data with the source's vocabulary."""
+        _, vocabulary = attrition_analysis.preprocess_data(source, is_training=True)
+        processed, _ = attrition_analysis.preprocess_data(synthetic.head(1000), is_training=False,
+                                                          vocabulary=vocabulary)
+        for col in vocabulary:
+            assert (processed[col] != attrition_analysis.UNKNOWN_CATEGORY).all()
+
+
+class TestStreamingOutput:
+    """Test suite for chunked CSV output."""
+    
+    @pytest.mark.parametrize('csv_engine', ['pyarrow', 'c'])
+    def test_chunked_csv_is_complete(self, generator, tmp_path, monkeypatch, csv_engine):
+        """Test that a multi-chunk file has one header, every row and sequential employee numbers."""
+        monkeypatch.setattr(attrition_analysis, 'CSV_ENGINE', csv_engine)
+        path = tmp_path / 'synthetic.csv'
+        rows = generator.write_csv(path, 2_503, seed=3, chunksize=500)
+        written = attrition_analysis.read_dataset(path, use_cache=False)
+        
+        assert rows == len(written) == 2_503
+        assert written['EmployeeNumber'].tolist() == list(range(1, 2_504))
+        assert list(written.columns) == generator.columns
+    
+    def test_output_is_reproducible(self, generator, tmp_path):
+        """Test that the same seed and chunk size produce the same file."""
+        first = tmp_path / 'first.csv'
+        second = tmp_path / 'second.csv'
+        generator.write_csv(first, 1_000, seed=7, chunksize=300)
+        generator.write_csv(second, 1_000, seed=7, chunksize=300)
+        
+        assert first.read_bytes() == second.read_bytes()